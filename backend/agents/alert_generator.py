@@ -1,6 +1,14 @@
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, AIMessageChunk
+from langchain_core.runnables import RunnableConfig
+from langchain_core.utils.json import parse_partial_json
 from pydantic import BaseModel, Field
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import json
+import re
+import threading
 from backend.utils.system_config import get_azure_chat_model
+from backend.utils.incident_profiler import bind_current_run
 
 # 1. 출력 스키마 정의 (Pydantic)
 class IncidentReport(BaseModel):
@@ -11,16 +19,7 @@ class IncidentReport(BaseModel):
     mms_text: str = Field(description="담당자 전파용 SMS 문구 (간결하게)")
     evidence: str = Field(description="판단 근거 (Tool 결과 인용)")
 
-def alert_generation_node(state):
-    """
-    수집된 정보를 바탕으로 구조화된 장애 리포트 생성
-    """
-    llm = get_azure_chat_model()
-    structured_llm = llm.with_structured_output(IncidentReport)
-    
-    messages = state["messages"]
-    
-    system_prompt = """
+ALERT_SYSTEM_PROMPT = """
     당신은 장애 전파 책임자(Alert Manager)입니다.
     이전 단계에서 진단 에이전트가 수집한 정보를 바탕으로 최종 리포트를 작성하세요.
     
@@ -29,18 +28,174 @@ def alert_generation_node(state):
     2. MMS 문구는 "[SKT 장애알림]"으로 시작하며, 80자 이내로 핵심만 요약.
     3. 조치 항목(Action Items)은 SOP에 기반하여 구체적으로 작성.
     """
+
+REVISE_SYSTEM_PROMPT = """
+    당신은 장애 전파 책임자(Alert Manager)입니다.
+    아래 [초안 리포트]는 이전까지의 근거로 미리 작성된 것입니다.
+    [추가 근거]와 [진단 결론]을 반영하여 달라진 항목(등급/위치 포함)만 수정하고, 나머지는 초안을 그대로 유지하세요.
+    작성 규칙(등급 Critical/Major/Minor, MMS는 "[SKT 장애알림]"으로 시작 80자 이내, SOP 기반 조치)은 동일합니다.
+    """
+
+# [Speculative] 리포트 초안 (그래프 superstep 밖에서 실행, thread_id 기준으로 alert_gen이 합류)
+DRAFT_WORKERS = 4
+DRAFT_TIMEOUT_SEC = 60
+_draft_executor = ThreadPoolExecutor(max_workers=DRAFT_WORKERS, thread_name_prefix="alert-draft")
+_drafts: Dict[str, Tuple[Future, int]] = {}
+_draft_listeners: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+_drafts_lock = threading.Lock()
+
+# 진단 결론이 초안 등급과 다른 등급을 언급하는지 확인용 ("주요"는 일반 서술에도 쓰여 제외)
+SEVERITY_TERMS = {
+    "Critical": ("critical", "심각"),
+    "Major": ("major",),
+    "Minor": ("minor", "경미"),
+}
+
+def count_evidence(messages):
+    """Tool 실행 결과(근거) 개수 - 초안이 어느 시점 근거로 작성됐는지 비교용"""
+    return sum(1 for m in messages if isinstance(m, ToolMessage))
+
+def severity_and_location_known(state):
+    """
+    초안 작성 가능 여부
+    - 위치: 대상 노드 Latency 점검 결과, 또는 로그의 기관/근본 원인 표기
+    - 등급: Latency 점검 상태 또는 SOP 검색 결과
+    """
+    tools = {m.name for m in state["messages"] if isinstance(m, ToolMessage)}
+    raw_log = state.get("raw_log", "")
+    location = "check_network_latency" in tools or "BANK:" in raw_log or "ROOT_SUSPECT:" in raw_log
+    severity = "check_network_latency" in tools or "search_sop_manual" in tools
+    return location and severity
+
+def _report_update(report: IncidentReport):
+    return {
+        "structured_report": report.dict(),
+        "final_action_plan": f"[{report.severity}] {report.location} - {report.root_cause}\n조치: {', '.join(report.action_items)}",
+        "incident_severity": report.severity,
+        "messages": [HumanMessage(content=f"최종 리포트 생성 완료: {report.mms_text}")]
+    }
+
+def _write_draft(thread_id: str, messages):
+    """
+    초안 작성 (토큰 스트리밍) - 확정되는 필드를 등록된 listener에 즉시 전달
+    (severity가 첫 필드이므로 초안 완료 전에 등급이 먼저 전파됨)
+    """
+    llm = get_azure_chat_model()
+    structured_llm = llm.with_structured_output(IncidentReport)
+    prompt = [SystemMessage(content=ALERT_SYSTEM_PROMPT)] + messages
+    # with_structured_output = (출력 형식이 바인딩된 모델 | 파서) - 모델 단계만 스트리밍하고 JSON은 직접 파싱
+    model = getattr(structured_llm, "first", None)
+    if model is None:
+        return structured_llm.invoke(prompt).dict()
+    parser = PartialReportParser()
+    for chunk in model.stream(prompt):
+        fields = parser.feed(chunk_text(chunk))
+        if fields:
+            _notify_draft(thread_id, fields)
+    return parser.report().dict()
+
+def listen_draft(thread_id: str, on_fields: Callable[[Dict[str, Any]], None]):
+    """초안 스트림에서 확정되는 필드를 받을 콜백 등록 (alert_gen 시작 또는 discard_draft 시 해제)"""
+    with _drafts_lock:
+        _draft_listeners[thread_id] = on_fields
+
+def _notify_draft(thread_id: str, fields: Dict[str, Any]):
+    # 해제 직후에는 전달하지 않도록 lock 안에서 호출 (최종 리포트 이후 초안 필드가 섞이지 않음)
+    with _drafts_lock:
+        on_fields = _draft_listeners.get(thread_id)
+        if on_fields:
+            on_fields(fields)
+
+def alert_draft_node(state, config: RunnableConfig):
+    """
+    [Speculative] 등급/위치가 확인되면 리포트 초안 작성을 백그라운드로 시작 (장애 건당 1회)
+    - 노드는 즉시 반환 -> 같은 superstep의 진단 라운드를 지연시키지 않음
+    - messages에는 쓰지 않음 (진단 ReAct 루프와 충돌 방지)
+    """
+    if not severity_and_location_known(state):
+        return {}
+    thread_id = config["configurable"]["thread_id"]
+    messages = list(state["messages"])
+    with _drafts_lock:
+        if thread_id in _drafts:
+            return {}
+        evidence_count = count_evidence(messages)
+        _drafts[thread_id] = (_draft_executor.submit(bind_current_run(_write_draft), thread_id, messages), evidence_count)
+    return {"draft_evidence_count": evidence_count}
+
+def draft_future(thread_id: str) -> Optional[Future]:
+    with _drafts_lock:
+        entry = _drafts.get(thread_id)
+    return entry[0] if entry else None
+
+def discard_draft(thread_id: str):
+    """사용되지 않은 초안 정리 (리포트 생성 전에 실행이 끝난 경우)"""
+    with _drafts_lock:
+        entry = _drafts.pop(thread_id, None)
+        _draft_listeners.pop(thread_id, None)
+    if entry:
+        entry[0].cancel()
+
+def _join_draft(thread_id: str):
+    """백그라운드 초안 결과 대기 -> (초안, 작성 시점 근거 개수). 없거나 실패하면 ({}, -1)"""
+    with _drafts_lock:
+        entry = _drafts.pop(thread_id, None)
+        _draft_listeners.pop(thread_id, None)
+    if entry is None:
+        return {}, -1
+    future, evidence_count = entry
+    try:
+        return future.result(timeout=DRAFT_TIMEOUT_SEC), evidence_count
+    except Exception:
+        # 초안 실패 시 alert_gen이 기존 방식(전체 컨텍스트)으로 작성
+        return {}, -1
+
+def conclusion_matches(draft: Dict[str, Any], conclusion: str) -> bool:
+    """
+    진단 결론이 초안의 판정을 유지하는지 확인
+    - 초안과 다른 등급을 언급하면 불일치
+    - 초안의 위치(기관/노드명)가 결론에 하나도 없으면 불일치
+    """
+    text = conclusion.lower()
+    mentioned = {sev for sev, terms in SEVERITY_TERMS.items() if any(t in text for t in terms)}
+    if mentioned - {draft.get("severity")}:
+        return False
+    terms = [t for t in re.split(r"[\s,/()\[\]]+", str(draft.get("location", "")).lower()) if len(t) >= 2]
+    return any(t in text for t in terms)
+
+def alert_generation_node(state, config: RunnableConfig):
+    """
+    수집된 정보를 바탕으로 구조화된 장애 리포트 생성
+    - 초안 이후 새 근거가 없고 진단 결론이 초안의 등급/위치와 일치하면 초안 그대로 확정 (LLM 호출 없음)
+    - 새 근거가 있거나 결론이 판정을 바꾸면 초안 + 추가 근거 + 결론만으로 경량 수정
+    - 초안이 없으면 전체 대화 기록으로 작성
+    """
+    messages = state["messages"]
+    draft, draft_count = _join_draft(config["configurable"]["thread_id"])
+    conclusion = messages[-1].content if messages and isinstance(messages[-1].content, str) else ""
     
     try:
-        # LLM 호출
-        report = structured_llm.invoke([SystemMessage(content=system_prompt)] + messages)
+        if draft and draft_count == count_evidence(messages) and conclusion_matches(draft, conclusion):
+            return _report_update(IncidentReport(**draft))
+
+        llm = get_azure_chat_model()
+        structured_llm = llm.with_structured_output(IncidentReport)
+
+        if draft and draft_count >= 0:
+            # 초안 이후 추가된 Tool 결과와 진단 결론만 전달 (컨텍스트 최소화, 추가 근거가 없을 수도 있음)
+            new_evidence = [m for m in messages if isinstance(m, ToolMessage)][draft_count:]
+            evidence_text = "\n".join(f"- {m.name}: {m.content}" for m in new_evidence) or "(없음)"
+            report = structured_llm.invoke([
+                SystemMessage(content=REVISE_SYSTEM_PROMPT),
+                HumanMessage(content=f"[초안 리포트]\n{json.dumps(draft, ensure_ascii=False)}\n\n"
+                                     f"[추가 근거]\n{evidence_text}\n\n[진단 결론]\n{conclusion}")
+            ])
+        else:
+            # LLM 호출
+            report = structured_llm.invoke([SystemMessage(content=ALERT_SYSTEM_PROMPT)] + messages)
         
         # State에 구조화된 데이터 저장
-        return {
-            "structured_report": report.dict(),
-            "final_action_plan": f"[{report.severity}] {report.location} - {report.root_cause}\n조치: {', '.join(report.action_items)}",
-            "incident_severity": report.severity,
-            "messages": [HumanMessage(content=f"최종 리포트 생성 완료: {report.mms_text}")]
-        }
+        return _report_update(report)
         
     except Exception as e:
         # Fallback (구조화 실패 시)
@@ -57,4 +212,51 @@ def alert_generation_node(state):
             "final_action_plan": "분석 실패 (수동 점검 필요)",
             "incident_severity": "Unknown",
              "messages": [HumanMessage(content="리포트 생성 중 오류 발생")]
-        }
\ No newline at end of file
+        }
+
+# ==========================================
+# 리포트 부분 파싱 (Structured Output 스트림)
+# ==========================================
+class PartialReportParser:
+    """
+    with_structured_output 호출의 토큰 스트림(JSON 조각)을 누적하며
+    값이 확정된 필드를 순서대로 반환 (IncidentReport는 severity가 첫 필드)
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._emitted: Dict[str, Any] = {}
+
+    def feed(self, text: str) -> Dict[str, Any]:
+        if not text:
+            return {}
+        self._buffer += text
+        try:
+            parsed = parse_partial_json(self._buffer)
+        except ValueError:
+            return {}
+        if not isinstance(parsed, dict) or not parsed:
+            return {}
+        # 마지막 키는 아직 값이 생성 중일 수 있으므로 그 이전 키만 확정으로 간주
+        keys = list(parsed.keys())
+        return self._diff({k: parsed[k] for k in keys[:-1]})
+
+    def report(self) -> IncidentReport:
+        """스트림 종료 후 누적된 JSON 전체를 리포트로 변환"""
+        return IncidentReport(**json.loads(self._buffer))
+
+    def _diff(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        new_fields = {k: v for k, v in fields.items() if self._emitted.get(k) != v}
+        self._emitted.update(new_fields)
+        return new_fields
+
+
+def chunk_text(message_chunk) -> str:
+    """AIMessageChunk에서 스트리밍 텍스트 추출 (json_schema: content / function_calling: tool args)"""
+    # messages 스트림에는 노드가 State에 추가한 완성 메시지도 섞여 있으므로 토큰 청크만 사용
+    if not isinstance(message_chunk, AIMessageChunk):
+        return ""
+    content = message_chunk.content if isinstance(message_chunk.content, str) else ""
+    if content:
+        return content
+    return "".join(c.get("args") or "" for c in getattr(message_chunk, "tool_call_chunks", []) or [])
@@ -1,45 +1,127 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
 from backend.utils.system_config import get_azure_chat_model
+from backend.utils.micro_batcher import MicroBatcher
 
 class TriageResult(BaseModel):
     is_incident: bool = Field(description="장애 상황이면 True, 단순 정보면 False")
     category: str = Field(description="장애 유형 (예: Network, Database, Application, None)")
     reason: str = Field(description="판단 근거")
 
-def triage_log_node(state):
-    """
-    로그가 장애 상황인지 단순 정보인지 판단 (Structured Output 적용)
-    """
-    llm = get_azure_chat_model()
-    raw_log = state.get("raw_log", "")
-    
-    # 구조화된 출력을 위한 LLM 설정
-    structured_llm = llm.with_structured_output(TriageResult)
+class IndexedTriageResult(TriageResult):
+    log_index: int = Field(description="입력 로그 번호 ([0], [1], ... 의 숫자)")
+
+class TriageBatchResult(BaseModel):
+    results: list[IndexedTriageResult] = Field(description="입력 로그마다 1개씩, 번호 순서대로")
 
-    system_prompt = """
+TRIAGE_SYSTEM_PROMPT = """
     당신은 SKT 결제 시스템의 1차 관제 라우터(Router)입니다.
     입력된 로그를 분석하여 즉각적인 조치가 필요한 '장애(Incident)'인지 판단하세요.
-    
+
     판단 기준:
     - ERROR, CRITICAL, Timeout, Connection Refused 키워드 -> True
     - INFO, DEBUG, Healthy, Stable -> False
-    
+
     애매한 경우 보수적으로 True(장애)로 판단하세요.
     """
-    
+
+BATCH_INSTRUCTION = """
+    여러 개의 로그가 번호([0], [1], ...)와 함께 주어집니다.
+    각 로그를 독립적으로 판단하여, 로그마다 정확히 1개의 결과를 log_index와 함께 반환하세요.
+    """
+
+# Micro-batching 설정 (수 ms 동안 모인 로그를 LLM 1회 호출로 분류)
+TRIAGE_MAX_BATCH_SIZE = 32
+TRIAGE_MAX_WAIT_MS = 15
+TRIAGE_TIMEOUT_SEC = 60
+TRIAGE_PREFETCH_LIMIT = 256   # 입장 시점에 미리 요청한 triage 결과 보관 수
+
+def classify_log_batch(raw_logs):
+    """로그 묶음을 한 번의 Structured Output 호출로 분류 (입력 순서대로 TriageResult 반환)"""
+    llm = get_azure_chat_model()
+    structured_llm = llm.with_structured_output(TriageBatchResult)
+
+    numbered = "\n".join(f"[{i}] {log}" for i, log in enumerate(raw_logs))
+    batch = structured_llm.invoke([
+        SystemMessage(content=TRIAGE_SYSTEM_PROMPT + BATCH_INSTRUCTION),
+        HumanMessage(content=f"Logs:\n{numbered}")
+    ])
+
+    by_index = {r.log_index: r for r in batch.results}
+    results = []
+    for i in range(len(raw_logs)):
+        r = by_index.get(i)
+        if r is None:
+            # 누락된 항목은 보수적으로 장애 처리
+            results.append(TriageResult(is_incident=True, category="Unknown", reason="배치 분류 결과 누락"))
+        else:
+            results.append(TriageResult(is_incident=r.is_incident, category=r.category, reason=r.reason))
+    return results
+
+_triage_batcher = None
+_batcher_lock = threading.Lock()
+_prefetched: "OrderedDict[str, Future]" = OrderedDict()
+_prefetch_lock = threading.Lock()
+
+def get_triage_batcher():
+    """동시 triage 요청을 모아 처리하는 Micro-batcher (프로세스당 1개)"""
+    global _triage_batcher
+    if _triage_batcher is None:
+        with _batcher_lock:
+            if _triage_batcher is None:
+                _triage_batcher = MicroBatcher(
+                    classify_log_batch,
+                    max_batch_size=TRIAGE_MAX_BATCH_SIZE,
+                    max_wait_ms=TRIAGE_MAX_WAIT_MS,
+                    name="triage-batcher",
+                )
+    return _triage_batcher
+
+def prefetch_triage(raw_log):
+    """
+    장애 접수(대기열 입장) 시점에 triage 요청
+    - 워크플로우 동시 실행 수와 무관하게 유입되는 로그 단위로 배치가 채워짐
+    - 결과는 해당 로그의 triage_log_node가 가져감
+    """
+    with _prefetch_lock:
+        future = _prefetched.get(raw_log)
+        if future is None:
+            future = get_triage_batcher().submit(raw_log)
+            _prefetched[raw_log] = future
+            if len(_prefetched) > TRIAGE_PREFETCH_LIMIT:
+                _prefetched.popitem(last=False)
+    return future
+
+def cancel_triage(raw_log):
+    """폐기된 장애 건의 선요청 triage를 취소 (아직 배치에 포함되지 않았으면 LLM 호출에서 제외)"""
+    with _prefetch_lock:
+        future = _prefetched.pop(raw_log, None)
+    if future is not None:
+        future.cancel()
+
+def _triage_future(raw_log):
+    with _prefetch_lock:
+        future = _prefetched.pop(raw_log, None)
+    return future or get_triage_batcher().submit(raw_log)
+
+def triage_log_node(state):
+    """
+    로그가 장애 상황인지 단순 정보인지 판단 (Structured Output + Micro-batching 적용)
+    """
+    raw_log = state.get("raw_log", "")
+
     try:
-        result = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Log: {raw_log}")
-        ])
-        
+        result = _triage_future(raw_log).result(timeout=TRIAGE_TIMEOUT_SEC)
+
         # State 업데이트 (추후 활용을 위해)
         return {
-            "incident_severity": "Unknown", 
+            "incident_severity": "Unknown",
             "messages": [HumanMessage(content=f"[Router] 분석결과: {result.category} ({result.reason})")]
         }
-        
+
     except Exception as e:
         # Fallback (오류 시 안전하게 장애로 간주)
         return {"messages": [HumanMessage(content=f"[Router Error] {str(e)}. Defaulting to Incident.")]}
@@ -5,12 +5,13 @@ from langgraph.checkpoint.memory import MemorySaver
 from backend.utils.incident_state import IncidentState
 from backend.agents.triage_router import triage_log_node, route_next
 from backend.agents.diagnosis_agent import diagnosis_node
-from backend.agents.alert_generator import alert_generation_node
+from backend.agents.alert_generator import alert_generation_node, alert_draft_node
 from backend.tools.infrastructure_tools import search_sop_manual, check_network_latency
 
 def build_incident_graph():
     """
     LangGraph Workflow 구성 (Router -> Diagnosis <-> Tools -> Alert)
+    - 등급/위치 확인 시 Alert 초안을 백그라운드로 시작, 남은 진단 라운드와 병렬 실행 (Speculative)
     """
     # 1. 그래프 초기화
     workflow = StateGraph(IncidentState)
@@ -24,6 +25,7 @@ def build_incident_graph():
     workflow.add_node("tools", tool_node)
     
     workflow.add_node("alert_gen", alert_generation_node)
+    workflow.add_node("alert_draft", alert_draft_node)
     
     # 3. 엣지 연결
     workflow.set_entry_point("triage")
@@ -58,6 +60,11 @@ def build_incident_graph():
     # Tools 실행 후 다시 Diagnosis로 복귀 (ReAct Loop)
     workflow.add_edge("tools", "diagnosis")
     
+    # 등급/위치가 확인되면 리포트 초안 작성을 백그라운드로 시작 (alert_draft는 즉시 반환)
+    # 이후 근거가 없으면 alert_gen이 초안을 확정 -> LLM 왕복 1회 절감
+    workflow.add_edge("tools", "alert_draft")
+    workflow.add_edge("alert_draft", END)
+    
     # Alert 생성 후 종료
     workflow.add_edge("alert_gen", END)
     
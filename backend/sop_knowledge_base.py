@@ -1,7 +1,8 @@
 from langchain_core.documents import Document
 from langchain_openai import AzureOpenAIEmbeddings  # [변경] Azure 전용 클래스
-from langchain_community.vectorstores import FAISS
 from backend.utils.system_config import SystemConfig
+from backend.tools.sop_vector_index import build_sop_vector_store
+from backend.tools.embedding_cache import CachedQueryEmbeddings
 
 def load_sop_documents():
     """SKT 결제 시스템 장애 대응 매뉴얼(SOP) 데이터"""
@@ -28,8 +29,9 @@ def get_sop_retriever():
             azure_endpoint=SystemConfig.AZURE_ENDPOINT,
             api_key=SystemConfig.API_KEY,
         )
+        embeddings = CachedQueryEmbeddings(embeddings, model_name=SystemConfig.EMBEDDING_DEPLOYMENT)
         
-        # requirements.txt에 faiss-cpu 포함됨
-        vectorstore = FAISS.from_documents(docs, embeddings)
+        # requirements.txt에 faiss-cpu 포함됨 (정규화 내적 인덱스, 규모별 유형 자동 선택)
+        vectorstore = build_sop_vector_store(docs, embeddings)
         _retriever_instance = vectorstore.as_retriever()
     return _retriever_instance
\ No newline at end of file
@@ -0,0 +1,78 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from backend.utils.micro_batcher import MicroBatcher
+
+# ==========================================
+# 질의 임베딩 캐시 + 동시 요청 배치 처리
+# ==========================================
+QUERY_CACHE_SIZE = 1024
+EMBED_MAX_BATCH_SIZE = 64
+EMBED_MAX_WAIT_MS = 10
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 정규화 (유니코드 NFKC + 공백 정리)"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    질의 벡터를 (모델, 정규화된 질의) 기준 LRU로 캐시하는 Embeddings 래퍼
+    - 캐시 적중 시 원격 임베딩 호출 생략
+    - 동일 질의의 동시 미스는 1건으로 합치고, 서로 다른 미스는 배치 1회로 임베딩
+    - 문서 임베딩(인덱스 구축)은 캐시 없이 그대로 전달
+    """
+
+    def __init__(self, base: Embeddings, model_name: str, max_entries: int = QUERY_CACHE_SIZE,
+                 max_batch_size: int = EMBED_MAX_BATCH_SIZE, max_wait_ms: float = EMBED_MAX_WAIT_MS):
+        self.base = base
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._batcher = MicroBatcher(base.embed_documents, max_batch_size=max_batch_size,
+                                     max_wait_ms=max_wait_ms, name="query-embedding-batcher")
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        query = normalize_query(text)
+        key = (self.model_name, query)
+
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return list(vector)
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                owner = False
+            else:
+                future = self._batcher.submit(query)
+                self._inflight[key] = future
+                self.stats["misses"] += 1
+                owner = True
+
+        try:
+            vector = future.result()
+        finally:
+            if owner:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                    if future.exception() is None:
+                        self._cache[key] = future.result()
+                        if len(self._cache) > self.max_entries:
+                            self._cache.popitem(last=False)
+        return list(vector)
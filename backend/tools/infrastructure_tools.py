@@ -1,8 +1,9 @@
 from langchain_core.tools import tool
-from langchain_community.vectorstores import FAISS
 from langchain_openai import AzureOpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
+from backend.tools.sop_vector_index import build_sop_vector_store
+from backend.tools.embedding_cache import CachedQueryEmbeddings
 import os
 from datetime import datetime
 
@@ -70,16 +71,19 @@ def initialize_vector_store():
     splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
     split_docs = splitter.split_documents(documents)
     
-    # 임베딩 및 인덱싱
+    # 임베딩 및 인덱싱 (코퍼스 규모에 따라 Flat / HNSW / IVF-PQ 자동 선택)
     embeddings = AzureOpenAIEmbeddings(
         model="text-embedding-3-small",
         azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
         api_key=os.getenv("AZURE_OPENAI_API_KEY"),
         api_version="2023-05-15"
     )
+    # 반복 질의(E-503, E-408 등)는 캐시, 동시 미스는 배치 1회로 임베딩
+    embeddings = CachedQueryEmbeddings(embeddings, model_name="text-embedding-3-small")
     
-    vector_store = FAISS.from_documents(split_docs, embeddings)
-    print(f"[{datetime.now()}] ✅ FAISS Index Created with {len(split_docs)} chunks.")
+    vector_store = build_sop_vector_store(split_docs, embeddings)
+    index_name = type(vector_store.index).__name__
+    print(f"[{datetime.now()}] ✅ FAISS Index ({index_name}) Created with {len(split_docs)} chunks.")
 
 # ==========================================
 # 3. Tools 정의
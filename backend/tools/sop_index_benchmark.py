@@ -0,0 +1,124 @@
+"""
+SOP 인덱스 오프라인 벤치마크 (Recall vs Latency)
+
+사용 예:
+    # 임베딩해 둔 코퍼스/질의 벡터 + 정답 라벨(질의별 관련 문서 번호 리스트, JSON)
+    python -m backend.tools.sop_index_benchmark --corpus corpus.npy --queries queries.npy --labels labels.json
+
+    # 합성 데이터 (라벨이 없으면 Flat 정확 검색 결과를 정답으로 사용)
+    python -m backend.tools.sop_index_benchmark --synthetic 200000 --dim 256
+"""
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+from backend.tools.sop_vector_index import INDEX_TYPES, build_faiss_index, normalize, set_search_params
+
+HNSW_EF_SWEEP = [16, 32, 64, 128, 256]
+IVF_NPROBE_SWEEP = [1, 4, 8, 16, 32, 64]
+PQ_SWEEP = [(nprobe, k_factor) for nprobe in (8, 16, 32) for k_factor in (4, 16, 64)]
+
+
+def make_synthetic(num_vectors: int, num_queries: int, dim: int, latent_dim: int = 32, seed: int = 0):
+    """군집 + 저차원 구조를 가진 합성 임베딩 (실제 문서 임베딩 분포와 유사하게)"""
+    rng = np.random.default_rng(seed)
+    projection = rng.normal(size=(latent_dim, dim))
+    centers = rng.normal(size=(max(num_vectors // 500, 8), latent_dim))
+
+    def sample(n):
+        latent = centers[rng.integers(len(centers), size=n)] + 0.5 * rng.normal(size=(n, latent_dim))
+        return latent @ projection + 0.05 * rng.normal(size=(n, dim))
+
+    return normalize(sample(num_vectors)), normalize(sample(num_queries))
+
+
+def recall_at_k(found: np.ndarray, truth, k: int) -> float:
+    """상위 k개 중 관련 문서 수 / min(관련 문서 수, k) (라벨 전체를 정답으로 사용)"""
+    hits = 0
+    total = 0
+    for row, relevant in zip(found, truth):
+        relevant = {int(r) for r in relevant}
+        hits += len(relevant & set(row[:k].tolist()))
+        total += min(len(relevant), k)
+    return hits / total if total else 0.0
+
+
+def measure(index, queries: np.ndarray, k: int):
+    latencies = []
+    results = np.empty((len(queries), k), dtype="int64")
+    for i, q in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(q.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results[i] = ids[0]
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def run_benchmark(corpus: np.ndarray, queries: np.ndarray, truth, k: int, index_types):
+    rows = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        index = build_faiss_index(corpus, index_type)
+        build_sec = time.perf_counter() - start
+        index_mb = faiss.serialize_index(index).nbytes / (1024 * 1024)
+
+        if index_type == "hnsw":
+            sweep = [("efSearch", v, {"ef_search": v}) for v in HNSW_EF_SWEEP]
+        elif index_type == "ivf_pq":
+            sweep = [("nprobe/kf", f"{n}/{kf}", {"nprobe": n, "k_factor": kf}) for n, kf in PQ_SWEEP]
+        elif index_type == "ivf_flat":
+            sweep = [("nprobe", v, {"nprobe": v}) for v in IVF_NPROBE_SWEEP]
+        else:
+            sweep = [("exact", "", {})]
+
+        for name, value, params in sweep:
+            set_search_params(index, **params)
+            found, p50, p95 = measure(index, queries, k)
+            rows.append({
+                "index": index_type, "param": f"{name}={value}" if value != "" else name,
+                "recall": recall_at_k(found, truth, k),
+                "p50_ms": p50, "p95_ms": p95,
+                "build_s": build_sec, "index_mb": index_mb,
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SOP FAISS 인덱스 Recall/Latency 벤치마크")
+    parser.add_argument("--corpus", help="코퍼스 임베딩 (.npy, N x dim)")
+    parser.add_argument("--queries", help="질의 임베딩 (.npy, Q x dim)")
+    parser.add_argument("--labels", help="질의별 관련 문서 인덱스 리스트 (JSON)")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 코퍼스 크기")
+    parser.add_argument("--num-queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--index", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        corpus, queries = make_synthetic(args.synthetic, args.num_queries, args.dim)
+    elif args.corpus and args.queries:
+        corpus, queries = normalize(np.load(args.corpus)), normalize(np.load(args.queries))
+    else:
+        parser.error("--synthetic 또는 --corpus/--queries 가 필요합니다.")
+
+    if args.labels:
+        with open(args.labels, encoding="utf-8") as f:
+            truth = json.load(f)
+    else:
+        exact = faiss.IndexFlatIP(corpus.shape[1])
+        exact.add(corpus)
+        _, truth = exact.search(queries, args.k)
+
+    print(f"corpus={len(corpus)} queries={len(queries)} dim={corpus.shape[1]} k={args.k}")
+    print(f"{'index':<9} {'param':<16} {'recall@k':>8} {'p50(ms)':>8} {'p95(ms)':>8} {'build(s)':>9} {'size(MB)':>9}")
+    for r in run_benchmark(corpus, queries, truth, args.k, args.index):
+        print(f"{r['index']:<9} {r['param']:<16} {r['recall']:>8.3f} {r['p50_ms']:>8.3f} "
+              f"{r['p95_ms']:>8.3f} {r['build_s']:>9.2f} {r['index_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
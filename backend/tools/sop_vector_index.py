@@ -0,0 +1,154 @@
+import math
+import os
+import warnings
+from typing import List, Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+
+# ==========================================
+# 1. 인덱스 선택 기준
+# ==========================================
+# 코퍼스 규모에 따라 자동 선택 (SOP_INDEX_TYPE 환경변수로 강제 지정 가능)
+#   ~10k      : flat    (정확 검색, 소규모에서는 가장 빠름)
+#   ~100k     : hnsw    (그래프 기반 ANN, 벡터는 SQ8로 압축 저장 -> float32 대비 1/4)
+#   100k 이상 : ivf_pq  (역색인 + Product Quantization, SQ8 재정렬로 정확도 보정)
+# 메모리 상한 예 (1536차원): hnsw 100k ≈ 180MB (SQ8 150MB + 그래프 25MB), ivf_pq는 벡터당 약 1.6KB
+FLAT_MAX_VECTORS = 10_000
+HNSW_MAX_VECTORS = 100_000
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64
+IVF_NPROBE = 16
+PQ_BITS = 8
+REFINE_K_FACTOR = 64   # PQ 후보를 k * 64개 뽑아 SQ8 벡터로 재정렬
+EMBED_BATCH_SIZE = 512
+
+# 학습이 필요한 인덱스의 최소 벡터 수 (FAISS 권장: 중심점당 39개, PQ 코드북은 2^bits개 중심)
+MIN_TRAIN_VECTORS = {"ivf_flat": 39, "ivf_pq": 39 * 2 ** PQ_BITS}
+SQ_TRAIN_SAMPLE = 65_536   # SQ8 (차원별 min/max) 학습 샘플 수
+
+
+def choose_index_type(num_vectors: int, requested: Optional[str] = None) -> str:
+    """requested(또는 SOP_INDEX_TYPE) 우선, 학습 데이터가 부족하면 규모 기준 자동 선택"""
+    forced = requested or os.getenv("SOP_INDEX_TYPE")
+    if forced in INDEX_TYPES:
+        if num_vectors >= MIN_TRAIN_VECTORS.get(forced, 0):
+            return forced
+        print(f"⚠️ [SOP Index] 벡터 {num_vectors}개로는 {forced} 학습 불가 -> 자동 선택으로 대체")
+    if num_vectors <= FLAT_MAX_VECTORS:
+        return "flat"
+    if num_vectors <= HNSW_MAX_VECTORS:
+        return "hnsw"
+    return "ivf_pq"
+
+
+def _ivf_nlist(num_vectors: int) -> int:
+    # 경험칙: sqrt(N)의 4배, 리스트당 최소 39개 학습 벡터 확보
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+
+
+def _pq_subquantizers(dim: int) -> int:
+    # 서브벡터 차원 8~16 수준 (1536차원 -> 96바이트/벡터, 원본 대비 1/64)
+    for sub_dim in (16, 12, 8, 24, 32, 4, 2):
+        if dim % sub_dim == 0:
+            return dim // sub_dim
+    return 1
+
+
+def normalize(vectors) -> np.ndarray:
+    """내적 검색이 코사인 유사도가 되도록 L2 정규화"""
+    arr = np.ascontiguousarray(np.asarray(vectors, dtype="float32"))
+    faiss.normalize_L2(arr)
+    return arr
+
+
+# ==========================================
+# 2. FAISS 인덱스 생성 / 파라미터
+# ==========================================
+def build_faiss_index(vectors: np.ndarray, index_type: Optional[str] = None) -> faiss.Index:
+    """정규화된 벡터로 Inner Product 인덱스 생성 (IVF 계열은 학습 포함)"""
+    num_vectors, dim = vectors.shape
+    if index_type is not None and index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 유형: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+    index_type = choose_index_type(num_vectors, index_type)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif index_type == "hnsw":
+        # 원본 float32 대신 SQ8 코드만 상주 (재현율 손실은 efSearch로 보정)
+        index = faiss.index_factory(dim, f"HNSW{HNSW_M},SQ8", faiss.METRIC_INNER_PRODUCT)
+        faiss.downcast_index(index).hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        sample_size = min(num_vectors, SQ_TRAIN_SAMPLE)
+        index.train(vectors[np.random.default_rng(0).choice(num_vectors, sample_size, replace=False)])
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        nlist = _ivf_nlist(num_vectors)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(faiss.IndexFlatIP(dim), dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        else:
+            # 원본(float32) 대비 PQ 코드 1/64 + SQ8 재정렬용 코드 1/4 만 상주
+            spec = f"IVF{nlist},PQ{_pq_subquantizers(dim)}x{PQ_BITS},Refine(SQ8)"
+            index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+        # 학습 샘플은 리스트당 최대 256개로 제한 (대규모 코퍼스 학습 시간 억제)
+        sample_size = min(num_vectors, max(nlist * 256, MIN_TRAIN_VECTORS[index_type]))
+        sample = vectors[np.random.default_rng(0).choice(num_vectors, sample_size, replace=False)]
+        index.train(sample)
+
+    set_search_params(index)
+    index.add(vectors)
+    return index
+
+
+def set_search_params(index: faiss.Index, nprobe: int = IVF_NPROBE, ef_search: int = HNSW_EF_SEARCH,
+                      k_factor: int = REFINE_K_FACTOR):
+    """검색 시점 정확도/속도 트레이드오프 파라미터 (벤치마크로 튜닝)"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexRefine):
+        index.k_factor = k_factor
+        index = faiss.downcast_index(index.base_index)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+    elif isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(nprobe, index.nlist)
+
+
+# ==========================================
+# 3. LangChain VectorStore 구성
+# ==========================================
+def build_sop_vector_store(documents: List[Document], embeddings, index_type: Optional[str] = None) -> FAISS:
+    """
+    SOP 청크를 배치 임베딩한 뒤 규모에 맞는 인덱스로 FAISS VectorStore 생성
+    (FAISS.from_documents의 Flat L2 인덱스 대체)
+    """
+    texts = [doc.page_content for doc in documents]
+    if not texts:
+        raise ValueError("인덱싱할 SOP 문서가 없습니다.")
+
+    # 배치 결과를 미리 할당한 float32 배열에 바로 기록 (Python float 리스트 누적 방지)
+    vectors = None
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        batch = np.asarray(embeddings.embed_documents(texts[start:start + EMBED_BATCH_SIZE]), dtype="float32")
+        if vectors is None:
+            vectors = np.empty((len(texts), batch.shape[1]), dtype="float32")
+        vectors[start:start + len(batch)] = batch
+    faiss.normalize_L2(vectors)
+
+    index = build_faiss_index(vectors, index_type)
+    ids = [str(i) for i in range(len(documents))]
+    with warnings.catch_warnings():
+        # 질의 벡터도 정규화해야 내적 = 코사인이 되므로 의도된 조합 (LangChain 경고 무시)
+        warnings.filterwarnings("ignore", message="Normalizing L2 is not applicable")
+        return FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids)),
+            normalize_L2=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+        )
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.utils.ring_buffer import RingBuffer
+
+# ==========================================
+# 이벤트 버스 (워커 스레드 -> API 클라이언트)
+# ==========================================
+MAX_BUFFERED_EVENTS = 2000
+# LLM 토큰은 묶어서 1건으로 발행 (토큰마다 슬롯을 쓰면 tool/report 이벤트가 금방 덮어써짐)
+TOKEN_FLUSH_CHARS = 200
+TOKEN_FLUSH_SEC = 0.25
+
+
+class IncidentEventBus:
+    """
+    워크플로우 실행 중 발생하는 세부 이벤트(LLM 토큰, Tool 시작/종료, 리포트 부분 결과)를
+    순번(seq)과 함께 보관하고, 클라이언트가 마지막으로 받은 seq 이후의 이벤트를 대기/조회
+    - 발행은 워커 스레드, 대기는 이벤트 루프 (스레드풀을 점유하지 않음)
+    - 클라이언트가 읽기 전에 덮어써진 구간은 'gap' 이벤트로 알림
+    """
+
+    def __init__(self, maxlen: int = MAX_BUFFERED_EVENTS):
+        self._events = RingBuffer(maxlen)
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._tokens: Dict[str, Dict[str, Any]] = {}   # incident_id -> 발행 대기 중인 토큰 묶음
+        self._token_lock = threading.Lock()
+
+    def publish(self, incident_id: str, event_type: str, data: Dict[str, Any]) -> int:
+        # 앞서 쌓인 토큰을 먼저 내보내 이벤트 순서 유지
+        self.flush_tokens(incident_id)
+        return self._append(incident_id, event_type, data)
+
+    def publish_token(self, incident_id: str, node: str, text: str):
+        """토큰은 TOKEN_FLUSH_CHARS / TOKEN_FLUSH_SEC 단위로 묶어서 발행"""
+        with self._token_lock:
+            pending = self._tokens.get(incident_id)
+            if pending is not None and pending["node"] != node:
+                self._flush_locked(incident_id)
+                pending = None
+            if pending is None:
+                pending = self._tokens[incident_id] = {"node": node, "text": "", "since": time.monotonic()}
+            pending["text"] += text
+            if len(pending["text"]) >= TOKEN_FLUSH_CHARS or time.monotonic() - pending["since"] >= TOKEN_FLUSH_SEC:
+                self._flush_locked(incident_id)
+
+    def flush_tokens(self, incident_id: str):
+        with self._token_lock:
+            self._flush_locked(incident_id)
+
+    def _flush_locked(self, incident_id: str):
+        pending = self._tokens.pop(incident_id, None)
+        if pending and pending["text"]:
+            self._append(incident_id, "token", {"node": pending["node"], "text": pending["text"]})
+
+    def _append(self, incident_id: str, event_type: str, data: Dict[str, Any]) -> int:
+        seq = self._events.append({"incident_id": incident_id, "type": event_type, "data": data}, tag=incident_id)
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, signal in waiters:
+            try:
+                loop.call_soon_threadsafe(signal.set)
+            except RuntimeError:
+                pass  # 이미 종료된 이벤트 루프
+        return seq
+
+    def _collect(self, after_seq: int, incident_id: Optional[str]) -> List[Dict[str, Any]]:
+        # 장애 건 필터는 버퍼의 tag로 처리 (lock 안에서 해당 건의 레코드만 복사)
+        events = [{"seq": r["seq"], "ts": r["ts"], **r["data"]}
+                  for r in self._events.read_after(after_seq, tag=incident_id)]
+        first_seq = self._events.first_seq
+        if after_seq < first_seq - 1:
+            # 읽기 전에 덮어써진 구간 -> 조용히 건너뛰지 않고 알림 (seq는 재개 지점)
+            events.insert(0, {"seq": first_seq - 1, "ts": time.time(), "incident_id": incident_id,
+                              "type": "gap", "data": {"missed_after": after_seq, "resume_from": first_seq}})
+        return events
+
+    async def wait_events(self, after_seq: int = 0, incident_id: Optional[str] = None,
+                          timeout: float = 15.0) -> List[Dict[str, Any]]:
+        """after_seq 이후 이벤트가 생길 때까지 최대 timeout초 대기 (없으면 빈 리스트)"""
+        loop = asyncio.get_running_loop()
+        waiter = (loop, asyncio.Event())
+        deadline = loop.time() + timeout
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            while True:
+                # 조회 전에 신호를 지워야 조회 직후 발행된 이벤트를 놓치지 않음
+                waiter[1].clear()
+                events = self._collect(after_seq, incident_id)
+                remaining = deadline - loop.time()
+                if events or remaining <= 0:
+                    return events
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
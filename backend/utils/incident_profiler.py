@@ -0,0 +1,299 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:  # 시뮬레이션 모드 (LangChain 미설치)
+    BaseCallbackHandler = object
+
+# ==========================================
+# 1. 설정
+# ==========================================
+PROFILE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "profiles"))
+DEFAULT_INTERVAL_MS = 5.0
+MIN_INTERVAL_MS = 1.0   # 이보다 짧으면 샘플러가 코어 하나를 점유
+MAX_STACK_DEPTH = 128
+
+
+def _thread_cpu_time(ident: int) -> Optional[float]:
+    """스레드별 CPU 시간 (초). 지원하지 않는 플랫폼이면 None"""
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+
+def _fold_stack(frame) -> List[str]:
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        stack.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class _RunThreadTracker(BaseCallbackHandler):
+    """
+    이 실행의 노드/Tool 콜백이 발생한 스레드를 등록
+    (LangGraph 스레드풀은 장애 건 간 공유되므로 다른 장애 건의 작업을 샘플에서 제외)
+    """
+
+    def __init__(self):
+        self.active: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.active[threading.get_ident()] += 1
+
+    def _leave(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self.active[ident] -= 1
+            if self.active[ident] <= 0:
+                del self.active[ident]
+
+    def on_chain_start(self, *args, **kwargs):
+        self._enter()
+
+    def on_chain_end(self, *args, **kwargs):
+        self._leave()
+
+    def on_chain_error(self, *args, **kwargs):
+        self._leave()
+
+    def on_tool_start(self, *args, **kwargs):
+        self._enter()
+
+    def on_tool_end(self, *args, **kwargs):
+        self._leave()
+
+    def on_tool_error(self, *args, **kwargs):
+        self._leave()
+
+    @contextmanager
+    def attached(self):
+        """현재 스레드를 이 실행의 샘플링 대상으로 등록 (배치/초안 워커용)"""
+        self._enter()
+        try:
+            yield
+        finally:
+            self._leave()
+
+
+# 프로파일링 중인 실행의 tracker (LangGraph 노드 스레드로 context가 전파됨)
+_current_tracker: ContextVar[Optional[_RunThreadTracker]] = ContextVar("incident_profile_tracker", default=None)
+
+
+def current_run_tracker() -> Optional[_RunThreadTracker]:
+    """호출 시점의 프로파일링 대상 실행 (비활성 시 None)"""
+    return _current_tracker.get()
+
+
+@contextmanager
+def attach_run_trackers(trackers: Iterable[Optional[_RunThreadTracker]]):
+    """
+    다른 스레드(Micro-batcher, 초안 작성 풀)가 장애 건 대신 수행하는 작업을 해당 프로파일에 포함
+    (배치 1건이 여러 장애 건을 처리하면 각 프로파일에 모두 포함)
+    """
+    attached = [t for t in set(trackers) if t is not None]
+    for tracker in attached:
+        tracker._enter()
+    try:
+        yield
+    finally:
+        for tracker in attached:
+            tracker._leave()
+
+
+def bind_current_run(fn: Callable) -> Callable:
+    """fn을 다른 스레드에서 실행해도 호출 시점의 프로파일에 샘플링되도록 래핑"""
+    tracker = current_run_tracker()
+    if tracker is None:
+        return fn
+
+    def run(*args, **kwargs):
+        with tracker.attached():
+            return fn(*args, **kwargs)
+    return run
+
+
+# ==========================================
+# 2. 샘플링 세션 (장애 1건 단위)
+# ==========================================
+class ProfileSession:
+    """
+    워크플로우 실행 스레드와 이 실행의 LangGraph 스레드풀 작업을 주기적으로 샘플링하여
+    Wall-clock / CPU 스택을 flamegraph 호환(folded) 형식으로 수집
+    - 풀 작업 스레드는 callbacks()를 그래프 config에 넣어야 추적됨
+    - 배치/초안 워커 스레드는 current_run_tracker()로 전달받아 작업 중에만 추적됨
+    """
+
+    def __init__(self, incident_id: str, interval_ms: float = DEFAULT_INTERVAL_MS,
+                 on_finish: Optional[Callable[["ProfileSession"], None]] = None):
+        self.incident_id = incident_id
+        self.on_finish = on_finish
+        self.interval = interval_ms / 1000.0
+        self.wall_stacks: Counter = Counter()
+        self.cpu_stacks: Counter = Counter()   # 값: CPU 사용 시간 (us)
+        self.node_timings: List[Dict[str, Any]] = []
+        self._target_ident = threading.get_ident()
+        self._tracker = _RunThreadTracker()
+        self._cpu_last: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{incident_id}", daemon=True)
+        self._context_token = None
+        self._started_at = 0.0
+        self._last_mark = 0.0
+        self.samples = 0
+        self.duration = 0.0
+
+    def __enter__(self):
+        self._started_at = self._last_mark = time.perf_counter()
+        self._context_token = _current_tracker.set(self._tracker)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._sampler.join()
+        _current_tracker.reset(self._context_token)
+        self.duration = time.perf_counter() - self._started_at
+        if self.on_finish:
+            self.on_finish(self)
+        return False
+
+    def callbacks(self) -> list:
+        """그래프 실행 config["callbacks"]에 추가할 핸들러"""
+        return [self._tracker] if BaseCallbackHandler is not object else []
+
+    def mark(self, node: str):
+        """그래프 노드 완료 시점 기록 (직전 이벤트 이후 경과 시간을 해당 노드에 귀속)"""
+        now = time.perf_counter()
+        self.node_timings.append({"node": node, "wall_ms": round((now - self._last_mark) * 1000, 2)})
+        self._last_mark = now
+
+    def _run(self):
+        sampler_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == sampler_ident:
+                    continue
+                if ident != self._target_ident and ident not in self._tracker.active:
+                    continue
+                stack = ";".join(_fold_stack(frame))
+                self.wall_stacks[stack] += 1
+                cpu_now = _thread_cpu_time(ident)
+                if cpu_now is not None:
+                    cpu_prev = self._cpu_last.get(ident, cpu_now)
+                    self._cpu_last[ident] = cpu_now
+                    cpu_us = int((cpu_now - cpu_prev) * 1_000_000)
+                    if cpu_us > 0:
+                        self.cpu_stacks[stack] += cpu_us
+            self.samples += 1
+
+
+# ==========================================
+# 3. 프로파일러 (관리자 API에서 on/off)
+# ==========================================
+class IncidentProfiler:
+    """
+    관리자 요청 시에만 동작하는 장애 단위 프로파일러
+    - 다음 N건 또는 특정 incident_id 대상으로 활성화
+    - 비활성 상태에서는 플래그 확인 1회 외에 오버헤드 없음
+    """
+
+    def __init__(self, output_dir: str = PROFILE_DIR):
+        self.output_dir = output_dir
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._incident_ids: Set[str] = set()
+        self._interval_ms = DEFAULT_INTERVAL_MS
+
+    def arm(self, next_n: int = 0, incident_id: Optional[str] = None,
+            interval_ms: float = DEFAULT_INTERVAL_MS) -> Dict[str, Any]:
+        with self._lock:
+            self._remaining += max(next_n, 0)
+            if incident_id:
+                self._incident_ids.add(incident_id)
+            self._interval_ms = max(interval_ms, MIN_INTERVAL_MS)
+            self.enabled = bool(self._remaining or self._incident_ids)
+        return self.status()
+
+    def disarm(self) -> Dict[str, Any]:
+        with self._lock:
+            self._remaining = 0
+            self._incident_ids.clear()
+            self.enabled = False
+        return self.status()
+
+    def session(self, incident_id: str):
+        """프로파일링 대상이면 ProfileSession, 아니면 no-op 컨텍스트 반환"""
+        if not self.enabled:
+            return nullcontext()
+        with self._lock:
+            if incident_id in self._incident_ids:
+                self._incident_ids.discard(incident_id)
+            elif self._remaining > 0:
+                self._remaining -= 1
+            else:
+                return nullcontext()
+            self.enabled = bool(self._remaining or self._incident_ids)
+            interval_ms = self._interval_ms
+        return ProfileSession(incident_id, interval_ms, on_finish=self.save)
+
+    def save(self, session: ProfileSession):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(self.output_dir, f"{session.incident_id}_{stamp}")
+
+        for kind, stacks in (("wall", session.wall_stacks), ("cpu", session.cpu_stacks)):
+            with open(f"{base}.{kind}.folded", "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+        summary = {
+            "incident_id": session.incident_id,
+            "duration_ms": round(session.duration * 1000, 2),
+            "interval_ms": session.interval * 1000,
+            "samples": session.samples,
+            "node_timings": session.node_timings,
+            "cpu_unit": "us",
+        }
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"[{datetime.now()}] 🔬 [Profiler] {session.incident_id} 프로파일 저장: {base}.*")
+
+    def list_captures(self) -> List[str]:
+        if not os.path.isdir(self.output_dir):
+            return []
+        return sorted(os.listdir(self.output_dir), reverse=True)
+
+    def capture_path(self, name: str) -> Optional[str]:
+        # 목록에 있는 파일명만 허용 (경로 조작 방지)
+        if name not in self.list_captures():
+            return None
+        return os.path.join(self.output_dir, name)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "remaining_runs": self._remaining,
+            "incident_ids": sorted(self._incident_ids),
+            "interval_ms": self._interval_ms,
+        }
+
+
+profiler = IncidentProfiler()
@@ -0,0 +1,264 @@
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# ==========================================
+# 1. 우선순위 / 용량 정책
+# ==========================================
+# 숫자가 작을수록 먼저 처리 (야간 C-Level 보고 대상이 최우선)
+PRIORITY_ESCALATION = 0
+SEVERITY_PRIORITY = {"Critical": 1, "Major": 2, "Minor": 3}
+
+# 등급별 처리 기한 (초) - 기한을 넘긴 요청은 실행하지 않고 폐기
+SEVERITY_DEADLINE_SEC = {"Critical": 600, "Major": 180, "Minor": 60}
+# Critical / 야간 보고 대상은 기한이 지나도 폐기하지 않음 (늦더라도 반드시 처리)
+NEVER_EXPIRE_PRIORITY = SEVERITY_PRIORITY["Critical"]
+
+MAX_QUEUE_DEPTH = 200          # 대기열 최대 길이
+MAX_CONCURRENT_INCIDENTS = 2   # 동시에 실행 가능한 LLM 워크플로우 수
+MINOR_SHED_RATIO = 0.5         # LLM 포화 + 대기열 50% 이상이면 Minor 요청 차단
+RETRY_AFTER_SEC = 30
+
+# [규정] 야간(22:00~06:00) Critical 등급 장애 발생 시 C-Level 즉시 보고 원칙
+NIGHT_START_HOUR = 22
+NIGHT_END_HOUR = 6
+
+
+def classify_severity(error_log: str) -> str:
+    """실행 전 로그 키워드로 등급을 1차 추정 (triage 라우터 기준과 동일)"""
+    if "CRITICAL" in error_log:
+        return "Critical"
+    if "ERROR" in error_log or "Timeout" in error_log:
+        return "Major"
+    return "Minor"
+
+
+def is_night_time(now: Optional[datetime] = None) -> bool:
+    hour = (now or datetime.now()).hour
+    return hour >= NIGHT_START_HOUR or hour < NIGHT_END_HOUR
+
+
+def compute_priority(severity: str, now: Optional[datetime] = None) -> int:
+    if severity == "Critical" and is_night_time(now):
+        return PRIORITY_ESCALATION
+    return SEVERITY_PRIORITY.get(severity, SEVERITY_PRIORITY["Minor"])
+
+
+# ==========================================
+# 2. 대기열 항목
+# ==========================================
+@dataclass
+class IncidentTicket:
+    incident_id: str
+    scenario_type: str
+    error_log: str
+    severity: str
+    priority: int
+    enqueued_at: float
+    deadline: float
+    merged_count: int = 0
+    state: str = "queued"   # queued -> running -> done / shed / expired
+
+    @property
+    def merge_key(self):
+        return (self.scenario_type, self.error_log)
+
+
+# ==========================================
+# 3. Admission Control 대기열
+# ==========================================
+class IncidentAdmissionQueue:
+    """
+    장애 처리 요청의 입장 제어 및 우선순위 스케줄링
+    - 등급/야간 보고 규정 기반 우선순위 큐 (Critical이 Minor 뒤에서 대기하지 않음)
+    - 동일 로그는 병합, 대기열 포화 시 하위 등급부터 폐기
+    - 처리 불가 시 호출자에게 'overloaded' 상태를 명시적으로 반환
+    """
+
+    def __init__(self, handler: Callable[[IncidentTicket], None],
+                 max_depth: int = MAX_QUEUE_DEPTH,
+                 max_concurrency: int = MAX_CONCURRENT_INCIDENTS,
+                 on_drop: Optional[Callable[[IncidentTicket], None]] = None):
+        self.handler = handler
+        self.on_drop = on_drop   # 실행되지 못하고 폐기된 티켓 통지 (state: shed / expired)
+        self.max_depth = max_depth
+        self.max_concurrency = max_concurrency
+
+        self._heap: List[list] = []
+        self._pending: Dict[tuple, IncidentTicket] = {}
+        self._entries: Dict[str, list] = {}
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._workers: List[threading.Thread] = []
+        self._stats = {"accepted": 0, "merged": 0, "shed": 0, "expired": 0, "rejected": 0, "completed": 0}
+
+    # ---------- 워커 ----------
+    def start(self):
+        with self._cond:
+            if self._workers:
+                return
+            for i in range(self.max_concurrency):
+                t = threading.Thread(target=self._worker_loop, name=f"incident-worker-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    def _worker_loop(self):
+        while True:
+            ticket = self._next_ticket()
+            try:
+                self.handler(ticket)
+            except Exception as e:
+                print(f"[{datetime.now()}] ❌ [Queue] {ticket.incident_id} 처리 중 예외: {e}")
+            finally:
+                with self._cond:
+                    ticket.state = "done"
+                    self._in_flight -= 1
+                    self._stats["completed"] += 1
+
+    def _next_ticket(self) -> IncidentTicket:
+        with self._cond:
+            while True:
+                while not self._pending:
+                    self._cond.wait()
+                _, _, ticket = heapq.heappop(self._heap)
+                if ticket is None or ticket.state != "queued":
+                    continue  # 재정렬/폐기로 무효화된 항목 (lazy deletion)
+                if self._is_expired(ticket, time.time()):
+                    self._drop(ticket, "expired")
+                    continue
+                self._remove(ticket)
+                ticket.state = "running"
+                self._in_flight += 1
+                return ticket
+
+    # ---------- 입장 제어 ----------
+    def submit(self, scenario_type: str, error_log: str) -> Dict[str, Any]:
+        now = time.time()
+        severity = classify_severity(error_log)
+        priority = compute_priority(severity)
+
+        with self._cond:
+            # 0) 기한이 지난 항목은 대기열 길이에서 제외 (불필요한 차단/거절 방지)
+            self._purge_expired(now)
+
+            # 1) 동일 로그가 이미 대기 중이면 병합
+            queued = self._pending.get((scenario_type, error_log))
+            if queued is not None:
+                queued.merged_count += 1
+                queued.deadline = max(queued.deadline, now + SEVERITY_DEADLINE_SEC[severity])
+                if priority < queued.priority:
+                    self._reprioritize(queued, priority)
+                self._stats["merged"] += 1
+                return self._result("merged", queued)
+
+            saturated = self._in_flight >= self.max_concurrency
+            depth = len(self._pending)
+
+            # 2) LLM 포화 상태에서 Minor 요청은 대기열에 쌓지 않음
+            if saturated and severity == "Minor" and depth >= self.max_depth * MINOR_SHED_RATIO:
+                self._stats["shed"] += 1
+                return self._overloaded("shed", severity, priority)
+
+            # 3) 대기열 가득 참 -> 더 낮은 우선순위 항목을 밀어냄, 없으면 거절
+            if depth >= self.max_depth:
+                victim = self._lowest_priority_ticket()
+                if victim is None or victim.priority <= priority:
+                    self._stats["rejected"] += 1
+                    return self._overloaded("overloaded", severity, priority)
+                self._drop(victim, "shed")
+
+            ticket = IncidentTicket(
+                incident_id=f"inc-{next(self._ids):06d}",
+                scenario_type=scenario_type,
+                error_log=error_log,
+                severity=severity,
+                priority=priority,
+                enqueued_at=now,
+                deadline=now + SEVERITY_DEADLINE_SEC[severity],
+            )
+            self._pending[ticket.merge_key] = ticket
+            self._push(ticket)
+            self._stats["accepted"] += 1
+            self._cond.notify()
+            return self._result("accepted", ticket)
+
+    def _is_expired(self, ticket: IncidentTicket, now: float) -> bool:
+        return ticket.priority > NEVER_EXPIRE_PRIORITY and now > ticket.deadline
+
+    def _purge_expired(self, now: float):
+        for ticket in [t for t in self._pending.values() if self._is_expired(t, now)]:
+            self._drop(ticket, "expired")
+
+    def _remove(self, ticket: IncidentTicket):
+        # 힙 항목은 lazy deletion (꺼낼 때 state로 판별)
+        del self._pending[ticket.merge_key]
+        del self._entries[ticket.incident_id]
+
+    def _drop(self, ticket: IncidentTicket, state: str):
+        self._remove(ticket)
+        ticket.state = state
+        self._stats[state] += 1
+        print(f"[{datetime.now()}] ⚠️ [Queue] {ticket.incident_id} ({ticket.severity}) 폐기: {state}")
+        if self.on_drop:
+            try:
+                self.on_drop(ticket)
+            except Exception as e:
+                print(f"[{datetime.now()}] ❌ [Queue] 폐기 통지 실패: {e}")
+
+    def _push(self, ticket: IncidentTicket):
+        entry = [ticket.priority, next(self._seq), ticket]
+        self._entries[ticket.incident_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _reprioritize(self, ticket: IncidentTicket, priority: int):
+        # 기존 힙 항목은 무효화하고 같은 티켓을 새 우선순위로 재삽입
+        self._entries[ticket.incident_id][2] = None
+        ticket.priority = priority
+        self._push(ticket)
+
+    def _lowest_priority_ticket(self) -> Optional[IncidentTicket]:
+        # 우선순위가 가장 낮고, 같은 등급이면 가장 최근에 들어온 항목
+        if not self._pending:
+            return None
+        return max(self._pending.values(), key=lambda t: (t.priority, t.enqueued_at))
+
+    def _result(self, status: str, ticket: IncidentTicket) -> Dict[str, Any]:
+        return {
+            "status": status,
+            "incident_id": ticket.incident_id,
+            "severity": ticket.severity,
+            "priority": ticket.priority,
+            "queue_depth": len(self._pending),
+        }
+
+    def _overloaded(self, reason: str, severity: str, priority: int) -> Dict[str, Any]:
+        return {
+            "status": "overloaded",
+            "reason": reason,
+            "severity": severity,
+            "priority": priority,
+            "queue_depth": len(self._pending),
+            "retry_after": RETRY_AFTER_SEC,
+        }
+
+    # ---------- 조회 ----------
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            by_severity = {s: 0 for s in SEVERITY_PRIORITY}
+            for t in self._pending.values():
+                by_severity[t.severity] = by_severity.get(t.severity, 0) + 1
+            return {
+                "queue_depth": len(self._pending),
+                "max_depth": self.max_depth,
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "saturated": self._in_flight >= self.max_concurrency,
+                "by_severity": by_severity,
+                "stats": dict(self._stats),
+            }
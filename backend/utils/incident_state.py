@@ -19,4 +19,7 @@ class IncidentState(TypedDict):
     final_action_plan: str
     
     # 장애 심각도
-    incident_severity: str
\ No newline at end of file
+    incident_severity: str
+    
+    # [Speculative] 백그라운드 리포트 초안 시작 시점의 Tool 결과 개수 (이후 근거가 추가되면 초안 수정)
+    draft_evidence_count: int
\ No newline at end of file
@@ -0,0 +1,91 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List
+
+from backend.utils.incident_profiler import attach_run_trackers, current_run_tracker
+
+
+class MicroBatcher:
+    """
+    여러 호출자의 요청을 짧은 시간(max_wait_ms) 동안 모아 batch_fn 한 번으로 처리하고
+    각 호출자에게 자신의 결과를 Future로 돌려줌
+    - batch_fn(items) 는 items와 같은 길이/순서의 결과 리스트를 반환해야 함
+    - batch_fn 예외 시 해당 배치의 모든 Future에 예외 전달
+    - 최대 max_in_flight개 배치를 동시에 처리 (느린 배치 1건이 다음 배치를 막지 않도록)
+    - 대기 요청이 max_queue_size를 넘으면 즉시 예외가 담긴 Future 반환
+    - 배치 구성 전에 취소된 Future는 배치에서 제외
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 20.0, name: str = "micro-batcher",
+                 max_in_flight: int = 4, max_queue_size: int = 1024):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max_queue_size)
+        self._slots = threading.Semaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=name)
+        self._stats_lock = threading.Lock()
+        self.stats = {"batches": 0, "items": 0, "rejected": 0, "cancelled": 0}
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        try:
+            # 호출자가 프로파일링 대상이면 배치 처리 중 워커 스레드도 샘플링
+            self._queue.put_nowait((item, future, current_run_tracker()))
+        except queue.Full:
+            with self._stats_lock:
+                self.stats["rejected"] += 1
+            future.set_exception(RuntimeError(f"배치 대기열 포화 ({self._queue.maxsize}건)"))
+        return future
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # 실행 상태로 전환 (이미 취소된 요청은 LLM 호출에서 제외)
+        live = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if len(live) < len(batch):
+            with self._stats_lock:
+                self.stats["cancelled"] += len(batch) - len(live)
+        return live
+
+    def _run(self):
+        while True:
+            # 처리 슬롯을 먼저 확보한 뒤 배치를 모음 (슬롯을 기다리는 동안 요청이 계속 쌓여 배치가 커짐)
+            self._slots.acquire()
+            batch = self._collect()
+            if not batch:
+                self._slots.release()
+                continue
+            self._executor.submit(self._process, batch)
+
+    def _process(self, batch: List[tuple]):
+        items = [item for item, _, _ in batch]
+        try:
+            with attach_run_trackers(tracker for _, _, tracker in batch):
+                results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise ValueError(f"배치 결과 개수 불일치 (요청 {len(items)}건, 결과 {len(results)}건)")
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finally:
+            with self._stats_lock:
+                self.stats["batches"] += 1
+                self.stats["items"] += len(items)
+            self._slots.release()
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,240 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+# ==========================================
+# 1. 결제망 토폴로지 (Gateway -> VAN/결제원 -> 은행/카드사)
+# ==========================================
+# 노드 -> 상위(upstream) 노드. 최상위 노드는 None
+PAYMENT_TOPOLOGY = {
+    "SKT_Gateway": None,
+    "금융결제원": "SKT_Gateway",
+    "KIS정보통신": "SKT_Gateway",
+    "NICE정보통신": "SKT_Gateway",
+    "신한은행": "금융결제원",
+    "국민은행": "금융결제원",
+    "우리은행": "금융결제원",
+    "하나은행": "금융결제원",
+    "농협은행": "금융결제원",
+    "삼성카드": "KIS정보통신",
+    "신한카드": "KIS정보통신",
+    "현대카드": "NICE정보통신",
+    "KB국민카드": "NICE정보통신",
+}
+
+
+class PaymentTopology:
+    """
+    상위 노드 포인터 기반 트리 (노드 수천 개 규모에서도 조회가 깊이에 비례)
+    """
+
+    def __init__(self, parents: Dict[str, Optional[str]]):
+        self.parents = dict(parents)
+        self.children: Dict[str, List[str]] = {n: [] for n in self.parents}
+        for node, parent in self.parents.items():
+            if parent is not None:
+                if parent not in self.parents:
+                    raise ValueError(f"토폴로지에 없는 상위 노드: {parent} (하위: {node})")
+                self.children[parent].append(node)
+
+        # 깊이 및 DFS 순서 사전 계산 (순환 구조면 일부 노드가 누락되어 오류)
+        self.depth: Dict[str, int] = {}
+        self.order: Dict[str, int] = {}
+        stack = [(n, 0) for n, p in self.parents.items() if p is None]
+        while stack:
+            node, depth = stack.pop()
+            self.depth[node] = depth
+            self.order[node] = len(self.order)
+            stack.extend((c, depth + 1) for c in reversed(self.children[node]))
+        if len(self.depth) != len(self.parents):
+            raise ValueError("토폴로지에 순환 구조가 있습니다.")
+
+    def ancestors(self, node: str) -> List[str]:
+        result = []
+        parent = self.parents.get(node)
+        while parent is not None:
+            result.append(parent)
+            parent = self.parents[parent]
+        return result
+
+    def subtree(self, node: str) -> List[str]:
+        result, stack = [], [node]
+        while stack:
+            n = stack.pop()
+            result.append(n)
+            stack.extend(self.children[n])
+        return sorted(result, key=self.order.get)
+
+    def common_upstream(self, nodes: List[str]) -> str:
+        """여러 노드의 최소 공통 상위 노드 (LCA)"""
+        lca = nodes[0]
+        for node in nodes[1:]:
+            a, b = lca, node
+            while self.depth[a] > self.depth[b]:
+                a = self.parents[a]
+            while self.depth[b] > self.depth[a]:
+                b = self.parents[b]
+            while a != b:
+                a, b = self.parents[a], self.parents[b]
+            lca = a
+        return lca
+
+
+# ==========================================
+# 2. 장애 상관 분석 (연쇄 장애 -> 근본 원인 1건)
+# ==========================================
+CORRELATION_WINDOW_SEC = 120
+# [SOP Triple_Fail] 3개 이상 기관 동시 장애 -> 공통 상위(VAN/게이트웨이) 이슈 의심
+MULTI_FAIL_THRESHOLD = 3
+# 공통 상위 노드의 직속 하위 중 이 비율 이상이 장애여야 상위 원인으로 합침
+CHILD_FAIL_RATIO = 0.5
+# 장애 로그(raw_log)에 포함할 최대 노드 수 / 샘플 로그 수 (프롬프트·병합 키 크기 제한)
+MAX_LOG_NODES = 20
+MAX_LOG_SAMPLES = 5
+
+
+@dataclass
+class CorrelatedIncident:
+    root_suspect: str
+    failed_nodes: List[str]
+    subtree: List[str]
+    status: str = "new"   # new / updated / unchanged
+    sample_logs: List[str] = field(default_factory=list)
+    new_nodes: List[str] = field(default_factory=list)   # updated: 이번에 새로 합쳐진 노드
+    new_logs: List[str] = field(default_factory=list)
+    multi_fail_threshold: int = MULTI_FAIL_THRESHOLD
+
+    def to_log(self) -> str:
+        """진단 입력용 로그 (subtree는 API 응답으로만 제공, 로그 길이는 상한 고정)"""
+        level = "CRITICAL" if len(self.failed_nodes) >= self.multi_fail_threshold else "ERROR"
+        if len(self.failed_nodes) == 1:
+            # 단일 노드 장애는 다중 장애(Triple_Fail) 절차로 유도하지 않음
+            log = f"[{level}] Node Failure Detected | NODE:{self.root_suspect}"
+        else:
+            failed = ",".join(self.failed_nodes[:MAX_LOG_NODES])
+            if len(self.failed_nodes) > MAX_LOG_NODES:
+                failed += f",...(+{len(self.failed_nodes) - MAX_LOG_NODES})"
+            log = f"[{level}] Multi-Fail Detected | ROOT_SUSPECT:{self.root_suspect} | FAILED:{failed}"
+        if self.sample_logs:
+            # 하위 노드의 에러 코드(E-503 등)는 SOP 검색 근거이므로 유지
+            log += " | LOGS: " + " || ".join(self.sample_logs[:MAX_LOG_SAMPLES])
+        return log
+
+
+class FailureCorrelator:
+    """
+    시간 창(window) 안에 들어온 노드 장애를 토폴로지로 묶어
+    하위 장애는 상위 의심 노드 아래로 합치고, 근본 원인 단위로 장애 건을 생성
+    """
+
+    def __init__(self, topology: PaymentTopology, window_sec: float = CORRELATION_WINDOW_SEC,
+                 multi_fail_threshold: int = MULTI_FAIL_THRESHOLD):
+        self.topology = topology
+        self.window_sec = window_sec
+        self.multi_fail_threshold = multi_fail_threshold
+        self._failures: Dict[str, float] = {}   # 노드 -> 마지막 장애 시각
+        self._logs: Dict[str, str] = {}
+        self._opened: Dict[str, Set[str]] = {}  # 근본 원인 -> 이미 보고된 장애 노드
+        self._lock = threading.Lock()
+
+    def observe(self, node: str, log: str = "", ts: Optional[float] = None):
+        if node not in self.topology.parents:
+            raise ValueError(f"토폴로지에 없는 노드: {node}")
+        with self._lock:
+            self._failures[node] = ts if ts is not None else time.time()
+            if log:
+                self._logs[node] = log
+
+    def resolve(self, node: Optional[str] = None):
+        """노드 정상화 (node 미지정 시 전체 초기화)"""
+        with self._lock:
+            if node is None:
+                self._failures.clear()
+                self._logs.clear()
+                self._opened.clear()
+            else:
+                self._failures.pop(node, None)
+                self._logs.pop(node, None)
+
+    def correlate(self, now: Optional[float] = None, commit: bool = True) -> List[CorrelatedIncident]:
+        """commit=False면 조회만 (보고 이력을 갱신하지 않음)"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            for node, ts in list(self._failures.items()):
+                if now - ts > self.window_sec:
+                    del self._failures[node]
+                    self._logs.pop(node, None)
+            failed = set(self._failures)
+            groups = self._group(failed)
+
+            incidents = []
+            for suspect, members in groups.items():
+                members = sorted(members, key=self.topology.order.get)
+                known = self._opened.get(suspect)
+                status = "new" if known is None else ("unchanged" if known >= set(members) else "updated")
+                if commit:
+                    self._opened[suspect] = (known or set()) | set(members)
+                new_nodes = [n for n in members if n not in known] if status == "updated" else []
+                incidents.append(CorrelatedIncident(
+                    root_suspect=suspect,
+                    failed_nodes=members,
+                    subtree=self.topology.subtree(suspect),
+                    status=status,
+                    sample_logs=[self._logs[n] for n in members if n in self._logs],
+                    new_nodes=new_nodes,
+                    new_logs=[self._logs[n] for n in new_nodes if n in self._logs],
+                    multi_fail_threshold=self.multi_fail_threshold,
+                ))
+            # 상위 원인에 흡수된 기존 그룹은 정리
+            if commit:
+                for suspect in list(self._opened):
+                    if suspect not in groups:
+                        del self._opened[suspect]
+            return incidents
+
+    def _group(self, failed: Set[str]) -> Dict[str, Set[str]]:
+        # 노드별 '자신 포함 최상위 장애 조상' (없으면 None), memo로 O(장애 수 x 깊이)
+        top: Dict[str, Optional[str]] = {}
+        for node in failed:
+            path, cur = [], node
+            while cur is not None and cur not in top:
+                path.append(cur)
+                cur = self.topology.parents[cur]
+            running = top[cur] if cur is not None else None
+            for n in reversed(path):
+                if running is None and n in failed:
+                    running = n
+                top[n] = running
+
+        groups: Dict[str, Set[str]] = {}
+        for node in failed:
+            groups.setdefault(top[node], set()).add(node)
+
+        # 서로 다른 하위망에서 동시다발 장애 -> 공통 상위 노드가 실제로 영향받은 경우만 1건으로 합침
+        if len(groups) > 1 and len(failed) >= self.multi_fail_threshold:
+            suspect = self.topology.common_upstream(list(groups))
+            if self._upstream_degraded(suspect, failed, groups):
+                return {suspect: set(failed)}
+        return groups
+
+    def _upstream_degraded(self, node: str, failed: Set[str], groups: Dict[str, Set[str]]) -> bool:
+        """
+        공통 상위 노드 바로 아래 계층의 장애 여부 (서로 무관한 말단 장애는 합치지 않음)
+        - 직속 하위의 상당수(CHILD_FAIL_RATIO 이상)가 장애
+        - 또는 직속 하위의 중계 노드(VAN/결제원 등)가 장애이고, 장애가 직속 하위망 상당수에 걸쳐 있음
+        """
+        children = self.topology.children[node]
+        needed = max(2, CHILD_FAIL_RATIO * len(children))
+        failing = [c for c in children if c in failed]
+        if len(failing) >= needed:
+            return True
+        affected = set()
+        for root in groups:
+            while self.topology.parents[root] != node:
+                root = self.topology.parents[root]
+            affected.add(root)
+        return any(self.topology.children[c] for c in failing) and len(affected) >= needed
+
+
+topology = PaymentTopology(PAYMENT_TOPOLOGY)
@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class RingBuffer:
+    """
+    고정 용량 이벤트 저장소 (메모리 사용량 일정)
+    - 슬롯을 미리 할당하고 seq % capacity 위치에 덮어씀 -> append O(1)
+    - seq는 1부터 증가하는 정수, 범위 조회는 seq 기준 O(k) / 시각 기준 O(log n + k)
+    - 문자열 레코드는 max_text_len으로 잘라 슬롯 크기 제한
+    - 레코드마다 선택적 tag(예: incident_id)를 두어 조회 시 필터링
+    """
+
+    def __init__(self, capacity: int, max_text_len: Optional[int] = None):
+        if capacity <= 0:
+            raise ValueError("capacity는 1 이상이어야 합니다.")
+        self.capacity = capacity
+        self.max_text_len = max_text_len
+        self._seqs = [0] * capacity
+        self._times = [0.0] * capacity
+        self._data: List[Any] = [None] * capacity
+        self._tags: List[Optional[str]] = [None] * capacity
+        self._next_seq = 1
+        self._last_ts = 0.0
+        self._lock = threading.Lock()
+
+    # ---------- 쓰기 ----------
+    def append(self, data: Any, ts: Optional[float] = None, tag: Optional[str] = None) -> int:
+        if self.max_text_len and isinstance(data, str) and len(data) > self.max_text_len:
+            data = data[:self.max_text_len - 3] + "..."
+        with self._lock:
+            seq = self._next_seq
+            # 시각 기준 이진 탐색을 위해 단조 증가 보장
+            ts = max(ts if ts is not None else time.time(), self._last_ts)
+            slot = seq % self.capacity
+            self._seqs[slot] = seq
+            self._times[slot] = ts
+            self._data[slot] = data
+            self._tags[slot] = tag
+            self._last_ts = ts
+            self._next_seq = seq + 1
+            return seq
+
+    # ---------- 읽기 ----------
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        """아직 덮어쓰지 않은 가장 오래된 seq"""
+        return self._first_seq()
+
+    def _first_seq(self) -> int:
+        return max(1, self._next_seq - self.capacity)
+
+    def _record(self, seq: int) -> Dict[str, Any]:
+        slot = seq % self.capacity
+        return {"seq": seq, "ts": self._times[slot], "tag": self._tags[slot], "data": self._data[slot]}
+
+    def _collect(self, seqs, tag: Optional[str], limit: Optional[int]) -> List[Dict[str, Any]]:
+        records = []
+        for s in seqs:
+            if limit is not None and len(records) >= limit:
+                break
+            if tag is None or self._tags[s % self.capacity] == tag:
+                records.append(self._record(s))
+        return records
+
+    def read_after(self, after_seq: int = 0, limit: Optional[int] = None,
+                   tag: Optional[str] = None) -> List[Dict[str, Any]]:
+        """after_seq 이후 레코드 (이미 덮어쓴 구간은 남아있는 가장 오래된 것부터)"""
+        with self._lock:
+            start = max(after_seq + 1, self._first_seq())
+            return self._collect(range(start, self._next_seq), tag, limit)
+
+    def read_since(self, since_ts: float, limit: Optional[int] = None,
+                   tag: Optional[str] = None) -> List[Dict[str, Any]]:
+        """since_ts 이후(포함) 기록된 레코드"""
+        with self._lock:
+            lo, hi = self._first_seq(), self._next_seq
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._times[mid % self.capacity] < since_ts:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return self._collect(range(lo, self._next_seq), tag, limit)
+
+    def tail(self, count: int, min_seq: int = 1, tag: Optional[str] = None) -> List[Dict[str, Any]]:
+        """최근 count개 (min_seq 이상만)"""
+        with self._lock:
+            start = max(self._first_seq(), min_seq)
+            records = self._collect(range(self._next_seq - 1, start - 1, -1), tag, count)
+            records.reverse()
+            return records
@@ -62,8 +62,11 @@ def fetch_status():
 
 def trigger_scenario(stype):
     try:
-        requests.post(f"{API_URL}/set_scenario", json={"scenario_type": stype}, timeout=1.0)
-        st.toast("🚀 명령 전달 완료", icon="✅")
+        res = requests.post(f"{API_URL}/set_scenario", json={"scenario_type": stype}, timeout=1.0)
+        if res.status_code == 503:
+            st.toast(f"⏳ 처리 용량 초과 ({res.json().get('retry_after')}초 후 재시도)", icon="⚠️")
+        else:
+            st.toast("🚀 명령 전달 완료", icon="✅")
     except:
         st.toast("⚠️ 백엔드 연결 실패", icon="❌")
 
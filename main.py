@@ -1,7 +1,11 @@
 import uvicorn
-from fastapi import FastAPI, BackgroundTasks
-from pydantic import BaseModel
-from typing import Dict, List
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import json
+import threading
 import time
 from datetime import datetime
 import sys
@@ -15,6 +19,8 @@ try:
     # 프로젝트 루트 경로 추가
     sys.path.append(os.path.abspath(os.path.dirname(__file__)))
     from backend.incident_workflow import build_incident_graph
+    from backend.agents.alert_generator import PartialReportParser, chunk_text, discard_draft, draft_future, listen_draft
+    from backend.agents.triage_router import cancel_triage, prefetch_triage
     from langchain_core.messages import HumanMessage, ToolMessage
     REAL_AI_AVAILABLE = True
     print("✅ [Server] AI Module Loaded.")
@@ -22,6 +28,12 @@ except Exception as e:
     print(f"⚠️ [Server] AI Module Missing ({e}). Running in Simulation Mode.")
     REAL_AI_AVAILABLE = False
 
+from backend.utils.incident_queue import IncidentAdmissionQueue
+from backend.utils.incident_events import IncidentEventBus
+from backend.utils.incident_profiler import MIN_INTERVAL_MS, profiler
+from backend.utils.payment_topology import FailureCorrelator, topology
+from backend.utils.ring_buffer import RingBuffer
+
 app = FastAPI(title="SKT Payment Guardian API")
 
 # ==========================================
@@ -33,136 +45,445 @@ NODES = [
     "삼성카드", "현대카드", "신한카드", "KB국민카드"
 ]
 
+# 에이전트 로그 / 노드 상태 이력 (고정 용량 링버퍼, seq 기반 범위 조회)
+AGENT_LOG_CAPACITY = 5000
+NODE_HISTORY_CAPACITY = 5000
+MAX_LOG_TEXT_LEN = 500
+STATUS_LOG_LIMIT = 100   # /status 응답에 포함할 최근 로그 수
+MAX_PARTIAL_REPORTS = 50 # 장애 건별 부분 리포트 보관 수
+
 # 초기 상태
 system_state = {
     "nodes": {node: "normal" for node in NODES},
-    "agent_logs": [],
+    "agent_logs": RingBuffer(AGENT_LOG_CAPACITY, max_text_len=MAX_LOG_TEXT_LEN),
+    "node_history": RingBuffer(NODE_HISTORY_CAPACITY),
+    "log_start_seq": 1,   # 현재 시나리오의 첫 로그 seq (시나리오 전환 시에만 갱신, /status는 이 이후만 표시)
     "scenario": "normal",
-    "is_processing": False
+    "partial_reports": OrderedDict(),   # incident_id -> 확정된 리포트 필드
+    "latest_incident_id": None
+}
+report_lock = threading.Lock()
+
+# 토큰/Tool/리포트 부분 결과 스트림 (GET /events)
+event_bus = IncidentEventBus()
+
+# 시나리오별 장애 노드 및 개별 로그 (토폴로지 상관 분석 입력)
+SCENARIO_FAILURES = {
+    "single_failure": [
+        ("신한은행", "[ERROR] TIME:14:05 | BANK:Shinhan | CODE:E-503 | MSG:Service Unavailable"),
+    ],
+    "triple_failure": [
+        ("KIS정보통신", ""),
+        ("삼성카드", ""),
+        ("국민은행", ""),
+    ],
 }
 
+# 연쇄 장애 -> 근본 원인 1건으로 묶는 상관 분석기
+correlator = FailureCorrelator(topology)
+root_incidents: Dict[str, str] = {}   # 근본 원인 노드 -> 장애 건 incident_id
+
 class StatusResponse(BaseModel):
     timestamp: str
     nodes: Dict[str, str]
     agent_logs: List[str]
+    last_log_seq: int = 0
     scenario: str
     is_processing: bool
+    partial_report: Dict[str, Any] = {}
 
 class ScenarioRequest(BaseModel):
     scenario_type: str
 
+class FailureReport(BaseModel):
+    node: str
+    log: str = ""
+
+class ProfilingRequest(BaseModel):
+    next_n: int = 0
+    incident_id: Optional[str] = None
+    interval_ms: float = Field(default=5.0, ge=MIN_INTERVAL_MS, le=1000.0)
+
 # ==========================================
 # 2. AI 실행 로직 (시뮬레이션 포함)
 # ==========================================
-def run_ai_background(scenario_type: str, error_log: str):
-    system_state["is_processing"] = True
-    system_state["agent_logs"] = []
-    
+def add_agent_log(text: str, incident_id: Optional[str] = None):
+    """에이전트 로그 기록 (장애 건별 조회를 위해 incident_id 태그)"""
+    system_state["agent_logs"].append(text, tag=incident_id)
+
+def run_ai_background(scenario_type: str, error_log: str, incident_id: str = None):
+    thread_id = incident_id or f"thread_{int(time.time())}"
+    start_partial_report(thread_id)
     ts = lambda: datetime.now().strftime("%H:%M:%S")
-    system_state["agent_logs"].append(f"[{ts()}] 🚀 [시스템] 장애 분석 및 대응 프로세스 시작...")
+    log = lambda text: add_agent_log(text, thread_id)
+    log(f"[{ts()}] 🚀 [시스템] 장애 분석 및 대응 프로세스 시작...")
 
     # [Case A] 모듈이 없거나 로딩 실패 시 -> 자체 시뮬레이션 (절대 에러 안 남)
     if not REAL_AI_AVAILABLE:
         time.sleep(1)
-        system_state["agent_logs"].append(f"[{ts()}] ⚠️ [시스템] AI 엔진 연동 불가. 시뮬레이션 모드로 전환.")
+        log(f"[{ts()}] ⚠️ [시스템] AI 엔진 연동 불가. 시뮬레이션 모드로 전환.")
         
         time.sleep(1)
-        system_state["agent_logs"].append(f"[{ts()}] 🚦 [라우터] 로그 분석 결과: 'Critical(심각)' 등급 판정.")
+        log(f"[{ts()}] 🚦 [라우터] 로그 분석 결과: 'Critical(심각)' 등급 판정.")
         
         time.sleep(1)
         if scenario_type == "single_failure":
-            system_state["agent_logs"].append(f"[{ts()}] 🩺 [진단] '신한은행' 응답 지연(3000ms) 확인.")
-            system_state["agent_logs"].append(f"[{ts()}] 🛠️ [도구] 네트워크 상태 점검(Ping) 완료.")
+            log(f"[{ts()}] 🩺 [진단] '신한은행' 응답 지연(3000ms) 확인.")
+            log(f"[{ts()}] 🛠️ [도구] 네트워크 상태 점검(Ping) 완료.")
         else:
-            system_state["agent_logs"].append(f"[{ts()}] 🩺 [진단] 다중 노드 접속 불가 확인.")
-            system_state["agent_logs"].append(f"[{ts()}] 🛠️ [도구] 전체 인프라 헬스체크 수행.")
+            log(f"[{ts()}] 🩺 [진단] 다중 노드 접속 불가 확인.")
+            log(f"[{ts()}] 🛠️ [도구] 전체 인프라 헬스체크 수행.")
 
         time.sleep(1)
-        system_state["agent_logs"].append(f"[{ts()}] 📚 [RAG] 에러 코드 기반 SOP 매뉴얼 검색 중...")
-        system_state["agent_logs"].append(f"[{ts()}] 💡 [결과] SOP 발견: '예비 라인 전환 및 담당자 전파'.")
+        log(f"[{ts()}] 📚 [RAG] 에러 코드 기반 SOP 매뉴얼 검색 중...")
+        log(f"[{ts()}] 💡 [결과] SOP 발견: '예비 라인 전환 및 담당자 전파'.")
         
         time.sleep(1)
-        system_state["agent_logs"].append(f"[{ts()}] 📨 [알림] 운영팀 및 담당자에게 SMS 발송 완료.")
-        system_state["agent_logs"].append(f"[{ts()}] ✅ [완료] 장애 대응 조치가 완료되었습니다.")
-        
-        system_state["is_processing"] = False
+        log(f"[{ts()}] 📨 [알림] 운영팀 및 담당자에게 SMS 발송 완료.")
+        log(f"[{ts()}] ✅ [완료] 장애 대응 조치가 완료되었습니다.")
         return
 
     # [Case B] 실제 AI 실행 (LangGraph)
     try:
-        graph = build_incident_graph()
-        thread_id = f"thread_{int(time.time())}"
-        config = {"configurable": {"thread_id": thread_id}}
+        # 관리자가 프로파일링을 켠 경우에만 샘플링 (꺼져 있으면 no-op)
+        with profiler.session(thread_id) as prof:
+            graph = build_incident_graph()
+            config = {"configurable": {"thread_id": thread_id}}
+            if prof:
+                # 공유 스레드풀 중 이 실행의 작업 스레드만 샘플링
+                config["callbacks"] = prof.callbacks()
         
-        inputs = {
-            "messages": [HumanMessage(content="장애 로그 분석 요청")], 
-            "raw_log": error_log,
-            "tool_steps": [],
-            "structured_report": {}
-        }
+            inputs = {
+                "messages": [HumanMessage(content="장애 로그 분석 요청")], 
+                "raw_log": error_log,
+                "tool_steps": [],
+                "structured_report": {}
+            }
         
-        for event in graph.stream(inputs, config=config):
-            now = ts()
-            for key, value in event.items():
-                if key == "triage":
-                    system_state["agent_logs"].append(f"[{now}] 🚦 [라우터] 로그 유형 분석 중...")
-                elif key == "tools":
-                    msgs = value.get("messages", [])
-                    for m in msgs:
-                        if isinstance(m, ToolMessage):
-                            content = m.content[:30] + "..."
-                            system_state["agent_logs"].append(f"[{now}] 📚 [도구 결과] {content}")
-                elif key == "diagnosis":
-                    msgs = value.get("messages", [])
-                    if msgs and not msgs[-1].tool_calls:
-                         system_state["agent_logs"].append(f"[{now}] 🧠 [진단] 원인 분석 및 추론 중...")
-                elif key == "alert_gen":
-                    report = value.get("structured_report", {})
-                    if report:
-                        sev = report.get('severity', 'INFO')
-                        system_state["agent_logs"].append(f"[{now}] 📨 [리포트] 등급: {sev}, MMS 발송 완료.")
-                        system_state["agent_logs"].append(f"[{now}] ✅ [완료] 워크플로우 종료.")
+            # 백그라운드 초안 스트림에서 확정되는 필드(등급 먼저)를 최종 리포트 작성 시작 전까지 전파
+            listen_draft(thread_id, lambda fields: publish_partial_report(thread_id, fields, ts()))
+
+            # updates: 노드 완료 단위 / messages: 노드 내부 LLM 토큰 단위
+            report_parser = PartialReportParser()
+            for mode, chunk in graph.stream(inputs, config=config, stream_mode=["updates", "messages"]):
+                now = ts()
+                if mode == "messages":
+                    message_chunk, metadata = chunk
+                    node = metadata.get("langgraph_node")
+                    text = chunk_text(message_chunk)
+                    if node == "diagnosis" and text and message_chunk.content:
+                        event_bus.publish_token(thread_id, node, message_chunk.content)
+                    elif node == "alert_gen" and text:
+                        fields = report_parser.feed(text)
+                        if fields:
+                            publish_partial_report(thread_id, fields, now)
+                    continue
+
+                for key, value in chunk.items():
+                    value = value or {}
+                    if prof:
+                        prof.mark(key)
+                    if key == "triage":
+                        log(f"[{now}] 🚦 [라우터] 로그 유형 분석 중...")
+                    elif key == "tools":
+                        msgs = value.get("messages", [])
+                        for m in msgs:
+                            if isinstance(m, ToolMessage):
+                                event_bus.publish(thread_id, "tool_end", {"tool": m.name, "output": m.content})
+                                content = m.content[:30] + "..."
+                                log(f"[{now}] 📚 [도구 결과] {content}")
+                    elif key == "diagnosis":
+                        msgs = value.get("messages", [])
+                        if msgs and msgs[-1].tool_calls:
+                            for call in msgs[-1].tool_calls:
+                                event_bus.publish(thread_id, "tool_start", {"tool": call["name"], "args": call["args"]})
+                        elif msgs:
+                             log(f"[{now}] 🧠 [진단] 원인 분석 및 추론 중...")
+                    elif key == "alert_draft":
+                        # 백그라운드 초안이 시작된 경우, 완료되는 즉시 등급/위치 전파
+                        future = draft_future(thread_id) if "draft_evidence_count" in value else None
+                        if future:
+                            with draft_publish_lock:
+                                pending_drafts[thread_id] = future
+                            future.add_done_callback(lambda f, iid=thread_id: publish_draft(iid, f))
+                    elif key == "alert_gen":
+                        with draft_publish_lock:
+                            pending_drafts.pop(thread_id, None)
+                        report = value.get("structured_report", {})
+                        if report:
+                            publish_partial_report(thread_id, changed_report_fields(thread_id, report), now)
+                            event_bus.publish(thread_id, "report", report)
+                            sev = report.get('severity', 'INFO')
+                            log(f"[{now}] 📨 [리포트] 등급: {sev}, MMS 발송 완료.")
+                            log(f"[{now}] ✅ [완료] 워크플로우 종료.")
 
     except Exception as e:
-        system_state["agent_logs"].append(f"[{ts()}] ❌ [오류] AI 실행 중 예외 발생: {str(e)}")
+        log(f"[{ts()}] ❌ [오류] AI 실행 중 예외 발생: {str(e)}")
+        event_bus.publish(thread_id, "error", {"message": str(e)})
     finally:
-        system_state["is_processing"] = False
+        discard_draft(thread_id)
+        with draft_publish_lock:
+            pending_drafts.pop(thread_id, None)
+        event_bus.publish(thread_id, "done", {})
+
+# 완료 대기 중인 백그라운드 초안 (최종 리포트가 나온 뒤에는 초안을 전파하지 않음)
+pending_drafts: Dict[str, Any] = {}
+draft_publish_lock = threading.Lock()
+
+def publish_draft(incident_id: str, future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    with draft_publish_lock:
+        if pending_drafts.get(incident_id) is not future:
+            return
+        draft = future.result()
+        event_bus.publish(incident_id, "report_draft", draft)
+        publish_partial_report(incident_id, changed_report_fields(incident_id, draft), datetime.now().strftime("%H:%M:%S"))
+
+def start_partial_report(incident_id: str):
+    with report_lock:
+        reports = system_state["partial_reports"]
+        reports[incident_id] = {}
+        while len(reports) > MAX_PARTIAL_REPORTS:
+            reports.popitem(last=False)
+        system_state["latest_incident_id"] = incident_id
+
+def changed_report_fields(incident_id: str, report: Dict[str, Any]):
+    with report_lock:
+        current = system_state["partial_reports"].get(incident_id, {})
+        return {k: v for k, v in report.items() if current.get(k) != v}
+
+def publish_partial_report(incident_id: str, fields: Dict[str, Any], now: str):
+    """확정된 리포트 필드를 즉시 전파 (severity가 가장 먼저 도착)"""
+    if not fields:
+        return
+    with report_lock:
+        current = system_state["partial_reports"].setdefault(incident_id, {})
+        first_severity = "severity" in fields and "severity" not in current
+        current.update(fields)
+    if first_severity:
+        add_agent_log(f"[{now}] ⚡ [리포트 초안] 등급 판정: {fields['severity']}", incident_id)
+    event_bus.publish(incident_id, "report_partial", fields)
+
+def report_dropped_ticket(ticket):
+    """실행되지 못하고 폐기된 장애 건을 로그/이벤트로 남김 (조용히 사라지지 않도록)"""
+    reason = "처리 기한 초과" if ticket.state == "expired" else "대기열 포화로 밀려남"
+    add_agent_log(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ [대기열] {ticket.incident_id} ({ticket.severity}) 폐기: {reason}",
+                  ticket.incident_id)
+    event_bus.publish(ticket.incident_id, "dropped", {"reason": ticket.state, "severity": ticket.severity})
+    if REAL_AI_AVAILABLE:
+        cancel_triage(ticket.error_log)
+
+# 장애 처리 대기열 (우선순위 + 입장 제어)
+incident_queue = IncidentAdmissionQueue(
+    handler=lambda ticket: run_ai_background(ticket.scenario_type, ticket.error_log, ticket.incident_id),
+    on_drop=report_dropped_ticket
+)
 
 # ==========================================
 # 3. API 엔드포인트
 # ==========================================
 @app.get("/status", response_model=StatusResponse)
-def get_status():
+def get_status(incident_id: Optional[str] = None):
+    logs = system_state["agent_logs"].tail(STATUS_LOG_LIMIT, system_state["log_start_seq"], incident_id)
+    with report_lock:
+        # incident_id 미지정 시 가장 최근에 시작한 장애 건
+        report = dict(system_state["partial_reports"].get(incident_id or system_state["latest_incident_id"], {}))
     return StatusResponse(
         timestamp=datetime.now().strftime("%H:%M:%S"),
         nodes=system_state["nodes"],
-        agent_logs=system_state["agent_logs"],
+        agent_logs=[r["data"] for r in logs],
+        last_log_seq=system_state["agent_logs"].last_seq,
         scenario=system_state["scenario"],
-        is_processing=system_state["is_processing"]
+        # 동시 실행 워커가 여러 개이므로 실행 중인 장애 건 수로 판단
+        is_processing=incident_queue.snapshot()["in_flight"] > 0,
+        partial_report=report
     )
 
+def set_node_status(node: str, status: str):
+    """노드 상태 변경 (실제 전이가 있을 때만 이력에 기록)"""
+    if system_state["nodes"].get(node) != status:
+        system_state["nodes"][node] = status
+        system_state["node_history"].append({"node": node, "status": status}, tag=node)
+
+def read_buffer(buffer: RingBuffer, after_seq: int, since: Optional[float], limit: int, tag: Optional[str]):
+    if since is not None:
+        return buffer.read_since(since, limit, tag)
+    return buffer.read_after(after_seq, limit, tag)
+
+@app.get("/logs")
+def get_logs(after_seq: int = 0, since: Optional[float] = None, limit: int = 200, incident_id: Optional[str] = None):
+    """에이전트 로그 범위 조회 (after_seq 이후 또는 since(epoch초) 이후, incident_id 지정 시 해당 장애 건만)"""
+    records = read_buffer(system_state["agent_logs"], after_seq, since, min(limit, AGENT_LOG_CAPACITY), incident_id)
+    logs = [{"seq": r["seq"], "ts": r["ts"], "incident_id": r["tag"], "text": r["data"]} for r in records]
+    return {"last_seq": system_state["agent_logs"].last_seq, "logs": logs}
+
+@app.get("/node_history")
+def get_node_history(after_seq: int = 0, since: Optional[float] = None, limit: int = 200, node: Optional[str] = None):
+    """노드 상태 전이 이력 범위 조회"""
+    records = read_buffer(system_state["node_history"], after_seq, since, min(limit, NODE_HISTORY_CAPACITY), node)
+    history = [{"seq": r["seq"], "ts": r["ts"], **r["data"]} for r in records]
+    return {"last_seq": system_state["node_history"].last_seq, "history": history}
+
+@app.get("/events")
+async def stream_events(after_seq: int = 0, incident_id: Optional[str] = None,
+                        last_event_id: Optional[str] = Header(default=None)):
+    """
+    Server-Sent Events: 토큰, Tool 시작/종료, 리포트 부분 결과를 생성 즉시 전달
+    - EventSource 재연결 시 Last-Event-ID 헤더 이후부터 재개 (중복 전송 방지)
+    """
+    if last_event_id and last_event_id.isdigit():
+        after_seq = int(last_event_id)
+
+    async def event_source():
+        last_seq = after_seq
+        while True:
+            events = await event_bus.wait_events(last_seq, incident_id)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for e in events:
+                last_seq = e["seq"]
+                yield f"id: {e['seq']}\nevent: {e['type']}\ndata: {json.dumps(e, ensure_ascii=False)}\n\n"
+    return StreamingResponse(event_source(), media_type="text/event-stream")
+
+@app.get("/queue")
+def get_queue():
+    return incident_queue.snapshot()
+
+@app.get("/admin/profiling")
+def get_profiling():
+    return {**profiler.status(), "captures": profiler.list_captures()}
+
+@app.post("/admin/profiling")
+def arm_profiling(req: ProfilingRequest):
+    """다음 N건 또는 특정 incident_id 실행을 프로파일링 (재배포 불필요)"""
+    if req.next_n <= 0 and not req.incident_id:
+        raise HTTPException(status_code=400, detail="next_n 또는 incident_id 중 하나는 필요합니다.")
+    return profiler.arm(req.next_n, req.incident_id, req.interval_ms)
+
+@app.delete("/admin/profiling")
+def disarm_profiling():
+    return profiler.disarm()
+
+@app.get("/admin/profiling/captures/{name}")
+def download_profile(name: str):
+    path = profiler.capture_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="프로파일 파일을 찾을 수 없습니다.")
+    return FileResponse(path, filename=name)
+
+def admit_incident(scenario_type: str, error_log: str):
+    # 즉시 실행하지 않고 대기열에 등록
+    incident_queue.start()
+    result = incident_queue.submit(scenario_type, error_log)
+    if REAL_AI_AVAILABLE and result["status"] == "accepted":
+        # 대기하는 동안 triage를 미리 배치 분류 (동시 실행 수 제한과 무관하게 유입량만큼 묶임)
+        prefetch_triage(error_log)
+    return result
+
+def submit_incident(scenario_type: str, error_log: str, response: Response):
+    # 포화 시 503 + overloaded 반환
+    return mark_overloaded(admit_incident(scenario_type, error_log), response)
+
+def mark_overloaded(result: Dict[str, Any], response: Response):
+    if result["status"] == "overloaded":
+        response.status_code = 503
+        response.headers["Retry-After"] = str(result.get("retry_after", 30))
+    return result
+
+def submit_correlated_incidents(scenario_type: str, response: Response):
+    """상관 분석 결과 새로 확인된 근본 원인만 장애 건으로 등록 (하위 연쇄 장애는 기존 장애 건에 합침)"""
+    results = []
+    incidents = correlator.correlate()
+    for incident in incidents:
+        if incident.status == "unchanged":
+            continue
+        if incident.status == "updated" and incident.root_suspect in root_incidents:
+            results.append(report_correlated_update(incident))
+            continue
+        if len(incident.failed_nodes) == 1 and incident.sample_logs:
+            error_log = incident.sample_logs[0]
+        else:
+            error_log = incident.to_log()
+        result = admit_incident(scenario_type, error_log)
+        if result.get("incident_id"):
+            root_incidents[incident.root_suspect] = result["incident_id"]
+        result["root_suspect"] = incident.root_suspect
+        result["failed_nodes"] = incident.failed_nodes
+        results.append(result)
+    # 상위 원인에 흡수되어 사라진 근본 원인은 정리
+    suspects = {i.root_suspect for i in incidents}
+    for suspect in [s for s in root_incidents if s not in suspects]:
+        del root_incidents[suspect]
+
+    if not results:
+        return {"status": "correlated", "incidents": []}
+    if len(results) == 1:
+        return mark_overloaded(results[0], response)
+    status = "overloaded" if all(r["status"] == "overloaded" for r in results) else "accepted"
+    return mark_overloaded({"status": status, "incidents": results}, response)
+
+def report_correlated_update(incident):
+    """기존 근본 원인에 합쳐진 장애를 호출자/이벤트/로그로 알림 (새 로그가 조사 기록에 남도록)"""
+    incident_id = root_incidents[incident.root_suspect]
+    nodes = ", ".join(incident.new_nodes)
+    logs = f" | {' || '.join(incident.new_logs)}" if incident.new_logs else ""
+    add_agent_log(f"[{datetime.now().strftime('%H:%M:%S')}] 🔗 [상관 분석] {incident.root_suspect} 장애 건에 "
+                  f"{nodes} 추가{logs}", incident_id)
+    event_bus.publish(incident_id, "incident_updated", {
+        "root_suspect": incident.root_suspect,
+        "new_nodes": incident.new_nodes,
+        "new_logs": incident.new_logs,
+        "failed_nodes": incident.failed_nodes,
+    })
+    return {
+        "status": "updated",
+        "incident_id": incident_id,
+        "root_suspect": incident.root_suspect,
+        "failed_nodes": incident.failed_nodes,
+        "new_nodes": incident.new_nodes,
+    }
+
+@app.get("/topology")
+def get_topology():
+    return {
+        "parents": topology.parents,
+        "correlated": [i.__dict__ for i in correlator.correlate(commit=False)],
+    }
+
+@app.post("/failures")
+def report_failure(req: FailureReport, response: Response):
+    """개별 노드 장애 수신 -> 토폴로지 상관 분석 후 근본 원인 단위로 장애 건 생성"""
+    if req.node not in topology.parents:
+        raise HTTPException(status_code=404, detail=f"토폴로지에 없는 노드: {req.node}")
+    set_node_status(req.node, "error")
+    correlator.observe(req.node, req.log)
+    return submit_correlated_incidents("node_failure", response)
+
 @app.post("/set_scenario")
-def set_scenario(req: ScenarioRequest, background_tasks: BackgroundTasks):
+def set_scenario(req: ScenarioRequest, response: Response):
     system_state["scenario"] = req.scenario_type
+    # 시나리오 경계 (실행 중인 다른 장애 건의 로그는 incident_id 태그로 구분)
+    system_state["log_start_seq"] = system_state["agent_logs"].next_seq
     
-    # 노드 초기화
-    for n in NODES: system_state["nodes"][n] = "normal"
+    # 노드 초기화 (시나리오 장애 노드는 error 유지 -> 불필요한 전이 이력 방지)
+    failures = SCENARIO_FAILURES.get(req.scenario_type, [])
+    failed_nodes = {node for node, _ in failures}
+    for n in NODES: set_node_status(n, "error" if n in failed_nodes else "normal")
+    correlator.resolve()
+    root_incidents.clear()
     
-    error_log = "General Error"
-    if req.scenario_type == "single_failure":
-        system_state["nodes"]["신한은행"] = "error"
-        error_log = "[ERROR] TIME:14:05 | BANK:Shinhan | CODE:E-503 | MSG:Service Unavailable"
-    elif req.scenario_type == "triple_failure":
-        system_state["nodes"]["KIS정보통신"] = "error"
-        system_state["nodes"]["삼성카드"] = "error"
-        system_state["nodes"]["국민은행"] = "error"
-        error_log = "[CRITICAL] Multi-Fail Detected"
-    elif req.scenario_type == "normal":
-        system_state["agent_logs"] = [f"[{datetime.now().strftime('%H:%M:%S')}] 🟢 시스템 정상화 완료."]
+    if req.scenario_type == "normal":
+        add_agent_log(f"[{datetime.now().strftime('%H:%M:%S')}] 🟢 시스템 정상화 완료.")
         return {"status": "ok"}
 
-    background_tasks.add_task(run_ai_background, req.scenario_type, error_log)
-    return {"status": "accepted"}
+    if not failures:
+        return submit_incident(req.scenario_type, "General Error", response)
+
+    for node, log in failures:
+        correlator.observe(node, log)
+    return submit_correlated_incidents(req.scenario_type, response)
 
 if __name__ == "__main__":
     # 포트 8003